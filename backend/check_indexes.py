@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Index check - explain() every hot handler query and fail on collection scans.
+
+Builds INDEX_REGISTRY (server.py) on the configured database unless --no-build is given,
+then asks MongoDB for each query's winning plan. Any plan containing a COLLSCAN stage, or
+a registry index that failed to build, makes the command exit with status 1 - run it
+in CI or before a deploy after touching queries or the registry.
+
+--static needs no database: it checks every hot query against the registry with the
+planner's eligibility rules (an index can serve a query when its first key is filtered on,
+or is the sort key; a partial index only when the query implies its filter; every $or
+branch needs its own index). A query no registry index can serve is bound to COLLSCAN.
+
+Usage (MONGO_URL / DB_NAME come from backend/.env like the server):
+    python backend/check_indexes.py
+    python backend/check_indexes.py --no-build --verbose
+    python backend/check_indexes.py --static
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+if "--static" in sys.argv[1:]:
+    # server.py reads these at import time; static mode never connects. Only here - set
+    # unconditionally they would shadow backend/.env (load_dotenv keeps existing values)
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "index_check")
+
+import server  # noqa: E402
+
+SAMPLE_ID = "00000000-0000-0000-0000-000000000000"
+SAMPLE_IDS = [SAMPLE_ID, "11111111-1111-1111-1111-111111111111"]
+SAMPLE_TIME = "2026-01-01T00:00:00+00:00"
+OPEN_STATUSES = ["pending", "under_review"]
+LISTED_ITEM_STATUSES = ["active", "reported", "found_reported"]
+
+# (handler, collection, filter, sort) - one entry per query shape the handlers send
+HOT_QUERIES = [
+    ("student_login", "students", {"roll_number": "21CSE000001"}, None),
+    ("get_me / get_student", "students", {"id": SAMPLE_ID}, None),
+    ("get_students", "students", {}, [("created_at", -1)]),
+    ("get_students_by_context", "students", {"department": "CSE", "year": "1"}, [("full_name", 1)]),
+    ("get_folder", "students", {"year_folder_id": SAMPLE_ID}, None),
+    ("insert_students_bulk", "students", {"roll_number": {"$in": ["21CSE000001", "21CSE000002"]}}, None),
+    ("build_roster_sync_preview", "students",
+     {"$or": [{"year_folder_id": SAMPLE_ID}, {"roll_number": {"$in": ["21CSE000001"]}}]}, None),
+    ("get_ai_matches", "students", {"id": {"$in": SAMPLE_IDS}}, None),
+
+    ("admin_login", "admins", {"username": "superadmin"}, None),
+    ("require_admin lookups", "admins", {"id": SAMPLE_ID}, None),
+    ("startup_event", "admins", {"role": "super_admin"}, None),
+
+    ("get_item", "items", {"id": SAMPLE_ID, "is_deleted": False}, None),
+    ("get_my_items", "items", {"student_id": SAMPLE_ID, "is_deleted": False}, [("created_at", -1)]),
+    ("delete_student", "items", {"student_id": SAMPLE_ID}, None),
+    ("get_lobby_items", "items",
+     {"is_deleted": False, "status": {"$in": LISTED_ITEM_STATUSES}, "item_type": "lost"}, [("created_at", -1)]),
+    ("get_lobby_items (all types)", "items",
+     {"is_deleted": False, "status": {"$in": LISTED_ITEM_STATUSES}}, [("created_at", -1)]),
+    ("get_items (admin)", "items", {"is_deleted": False, "item_type": "found", "status": "reported"}, [("created_at", -1)]),
+    ("get_deleted_items", "items", {"is_deleted": True}, None),
+    ("get_stats", "items", {"status": "claimed"}, None),
+    ("get_found_similar_items", "items",
+     {"item_type": "found", "is_deleted": False, "related_lost_item_id": {"$in": SAMPLE_IDS}}, None),
+    ("find_match_candidates", "items",
+     {"item_type": "found", "is_deleted": False, "status": {"$in": ["reported", "active"]},
+      "category_id": {"$in": ["phone", "other"]}}, [("created_at", -1)]),
+
+    ("get_claim", "claims", {"id": SAMPLE_ID}, None),
+    ("create_claim (open claim check)", "claims",
+     {"item_id": SAMPLE_ID, "claimant_id": SAMPLE_ID, "status": {"$in": OPEN_STATUSES}}, None),
+    ("create_claim (daily limit)", "claims", {"claimant_id": SAMPLE_ID, "created_at": {"$gte": SAMPLE_TIME}}, None),
+    ("create_claim (item flood limit)", "claims", {"item_id": SAMPLE_ID, "status": {"$in": OPEN_STATUSES}}, None),
+    ("get_claims (student)", "claims", {"claimant_id": SAMPLE_ID}, [("created_at", -1)]),
+    ("get_claims (admin)", "claims", {"status": "pending"}, [("created_at", -1)]),
+    ("get_stats", "claims", {"status": {"$in": OPEN_STATUSES}}, None),
+    ("resume_pending_claim_analyses", "claims",
+     {"ai_analysis.status": "pending", "$or": [{"analysis_lease_until": None}, {"analysis_lease_until": {"$lt": SAMPLE_TIME}}]},
+     None),
+
+    ("get_found_responses", "found_responses", {"item_id": SAMPLE_ID}, [("created_at", -1)]),
+    ("submit_found_response (duplicate check)", "found_responses",
+     {"item_id": SAMPLE_ID, "responder_id": SAMPLE_ID, "status": {"$in": OPEN_STATUSES}}, None),
+    ("submit_found_response (daily limit)", "found_responses",
+     {"responder_id": SAMPLE_ID, "created_at": {"$gte": SAMPLE_TIME}}, None),
+
+    ("message by id", "messages", {"id": SAMPLE_ID, "recipient_id": SAMPLE_ID}, None),
+    ("get_unread_count / mark_all_read", "messages", {"recipient_id": SAMPLE_ID, "is_read": False}, None),
+    ("get_messages (student)", "messages",
+     {"recipient_id": SAMPLE_ID, "recipient_type": "student"}, [("created_at", -1)]),
+    ("get_messages (admin)", "messages",
+     {"$or": [{"sender_id": SAMPLE_ID}, {"recipient_id": SAMPLE_ID}]}, [("created_at", -1)]),
+    ("get_admin_sent_messages", "messages", {"sender_id": SAMPLE_ID, "sender_type": "admin"}, [("created_at", -1)]),
+
+    ("get_conversation_messages", "messages",
+     {"conversation_id": f"{SAMPLE_ID}:system",
+      "$or": [{"created_at": {"$lt": SAMPLE_TIME}}, {"created_at": SAMPLE_TIME, "id": {"$lt": SAMPLE_ID}}]},
+     [("created_at", -1), ("id", -1)]),
+    ("mark_conversation_read", "messages",
+     {"conversation_id": f"{SAMPLE_ID}:system", "recipient_id": SAMPLE_ID, "is_read": False}, None),
+
+    ("get_conversations", "conversations",
+     {"participant_ids": SAMPLE_ID,
+      "$or": [{"last_message_at": {"$lt": SAMPLE_TIME}}, {"last_message_at": SAMPLE_TIME, "id": {"$lt": SAMPLE_ID}}]},
+     [("last_message_at", -1), ("id", -1)]),
+    ("get_conversation_messages", "conversations", {"id": f"{SAMPLE_ID}:system", "participant_ids": SAMPLE_ID}, None),
+
+    ("get_feed_post", "feed_posts", {"id": SAMPLE_ID, "is_deleted": False}, None),
+    ("get_feed_posts", "feed_posts", {"is_deleted": False}, [("created_at", -1)]),
+
+    ("folder by id", "folders", {"id": SAMPLE_ID, "type": "year"}, None),
+    ("auto_migrate_students_to_folders", "folders", {"name": "CSE", "type": "department"}, None),
+    ("delete_folder", "folders", {"parent_id": SAMPLE_ID}, None),
+    ("rename_folder", "folders",
+     {"name": "1", "type": "year", "parent_id": SAMPLE_ID, "id": {"$ne": SAMPLE_ID}}, None),
+
+    ("get_roster_import", "excel_uploads", {"id": SAMPLE_ID}, None),
+    ("get_folder (upload history)", "excel_uploads", {"year_folder_id": SAMPLE_ID}, [("uploaded_at", -1)]),
+    ("resume_roster_imports", "excel_uploads", {"status": "queued"}, None),
+    ("recover_lapsed_roster_jobs", "excel_uploads",
+     {"status": "processing", "$or": [{"lease_until": None}, {"lease_until": {"$lt": SAMPLE_TIME}}]}, None),
+    ("get_roster_sync_preview", "roster_sync_previews", {"job_id": SAMPLE_ID, "kind": "add"}, [("seq", 1)]),
+    ("commit_roster_sync", "roster_sync_previews",
+     {"job_id": SAMPLE_ID, "kind": {"$in": ["add", "update"]}}, [("kind", 1), ("seq", 1)]),
+
+    ("get_found_similar_items", "item_matches",
+     {"lost_item_id": {"$in": SAMPLE_IDS}, "confidence": {"$gte": 60}}, [("confidence", -1)]),
+    ("get_item_matches", "item_matches", {"found_item_id": SAMPLE_ID}, None),
+    ("drop_stale_item_matches", "item_matches",
+     {"$or": [{"lost_item_id": SAMPLE_ID}, {"found_item_id": SAMPLE_ID}]}, None),
+
+    ("startup migrations", "system_config", {"key": "students_migrated_to_folders"}, None),
+    ("get_llm_metrics", "llm_metrics", {"created_at": {"$gte": SAMPLE_TIME}}, None),
+    ("get_llm_metrics (latency sample)", "llm_metrics",
+     {"endpoint": "claim_analysis", "cached": False, "created_at": {"$gte": SAMPLE_TIME}}, [("created_at", -1)]),
+    ("check_login_throttle (LOGIN_THROTTLE_STORE=mongo)", "login_attempts",
+     {"key": "ip:127.0.0.1", "at": {"$gt": 0}}, [("at", -1)]),
+]
+
+
+def plan_stages(plan):
+    """Every stage name in an explain() plan tree (classic and slot-based engine layouts)"""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from plan_stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from plan_stages(value)
+
+
+def index_can_serve(index, query: dict, sort) -> bool:
+    """Whether the planner could use this IndexModel for the query (ignoring $or)"""
+    document = index.document
+    partial = document.get("partialFilterExpression")
+    if partial and any(query.get(field) != value for field, value in partial.items()):
+        return False  # The query must imply the partial filter (simple equalities here)
+    first_key = next(iter(document["key"]))
+    return first_key in query or bool(sort and sort[0][0] == first_key)
+
+def statically_indexed(collection: str, query: dict, sort) -> bool:
+    indexes = server.INDEX_REGISTRY.get(collection, [])
+    fields = {field: value for field, value in query.items() if not field.startswith("$")}
+    if any(index_can_serve(index, fields, sort) for index in indexes):
+        return True
+    branches = query.get("$or")
+    # An $or is an index union - it needs an index for every branch
+    return bool(branches) and all(
+        any(index_can_serve(index, {**fields, **branch}, None) for index in indexes) for branch in branches
+    )
+
+def check_static(verbose: bool) -> int:
+    failures = 0
+    for handler, collection, query, sort in HOT_QUERIES:
+        if not statically_indexed(collection, query, sort):
+            failures += 1
+            print(f"❌ NO INDEX  {collection:<16} {handler}: {query}")
+        elif verbose:
+            print(f"✅ indexed   {collection:<16} {handler}")
+    print(f"{'❌' if failures else '✅'} {len(HOT_QUERIES)} hot queries checked statically, {failures} without a usable index")
+    return 1 if failures else 0
+
+async def explain_query(collection: str, query: dict, sort):
+    cursor = server.db[collection].find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    explained = await cursor.explain()
+    return list(plan_stages(explained["queryPlanner"]["winningPlan"]))
+
+
+async def check(build: bool, verbose: bool) -> int:
+    failures = 0
+    if build:
+        result = await server.ensure_indexes()
+        print(f"🔧 Index registry: {result['ensured']} ensured, {len(result['failed'])} failed")
+        for name in result["failed"]:
+            print(f"❌ Index not built: {name}")
+        failures += len(result["failed"])
+
+    for handler, collection, query, sort in HOT_QUERIES:
+        stages = await explain_query(collection, query, sort)
+        if "COLLSCAN" in stages:
+            failures += 1
+            print(f"❌ COLLSCAN  {collection:<16} {handler}: {query}")
+        elif "EOF" in stages and len(stages) == 1:
+            print(f"⚠️  EMPTY     {collection:<16} {handler}: collection does not exist yet")
+        elif verbose:
+            print(f"✅ {' > '.join(stages):<40} {collection:<16} {handler}")
+
+    print(f"{'❌' if failures else '✅'} {len(HOT_QUERIES)} hot queries checked, {failures} problems")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if a hot query runs as a collection scan")
+    parser.add_argument("--no-build", dest="build", action="store_false", help="Don't create registry indexes first")
+    parser.add_argument("--verbose", action="store_true", help="Also print the plan of passing queries")
+    parser.add_argument("--static", action="store_true", help="Check against the registry only - no database needed")
+    args = parser.parse_args()
+    if args.static:
+        return check_static(args.verbose)
+    return asyncio.run(check(args.build, args.verbose))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
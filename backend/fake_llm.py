@@ -0,0 +1,177 @@
+"""
+Fake LLM backend for offline load and latency testing.
+
+Enabled with LLM_BACKEND=fake. Stands in for the emergentintegrations provider
+inside llm_complete(): it recognises the matching, question-generation and
+claim-analysis prompts that server.py sends and returns schema-valid JSON
+for each, after a simulated provider latency. No network access, no API key.
+
+Configuration (environment variables):
+    FAKE_LLM_LATENCY         fixed:<ms> | uniform:<min_ms>:<max_ms> | lognormal:<median_ms>:<sigma>
+                             (default lognormal:800:0.5)
+    FAKE_LLM_ERROR_RATE      share of calls that raise FakeLLMError (default 0)
+    FAKE_LLM_MALFORMED_RATE  share of calls that return truncated JSON (default 0)
+    FAKE_LLM_SEED            seed for latency/error sampling (default: unseeded)
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+
+DEFAULT_LATENCY = "lognormal:800:0.5"
+
+
+class FakeLLMError(Exception):
+    """Injected provider failure"""
+
+
+def parse_latency_spec(spec: str):
+    """Turn a FAKE_LLM_LATENCY spec into a sampler returning seconds"""
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(":") if value]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        median_ms, sigma = values
+        return lambda rng: rng.lognormvariate(0, sigma) * median_ms / 1000
+    raise ValueError(f"Invalid FAKE_LLM_LATENCY spec: {spec!r}")
+
+
+def _words(text: str) -> set:
+    return {word for word in re.findall(r"[a-z0-9]+", text.lower()) if len(word) > 2}
+
+
+def _overlap(a: str, b: str) -> float:
+    words_a, words_b = _words(a), _words(b)
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+def _stable_int(text: str, modulo: int) -> int:
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16) % modulo
+
+
+def _json_after(label: str, prompt: str):
+    """The compact JSON value on the line after a prompt section label"""
+    match = re.search(re.escape(label) + r"\s*\n(.+)", prompt)
+    return json.loads(match.group(1)) if match else []
+
+
+def _prompt_field(label: str, prompt: str) -> str:
+    match = re.search(r"^-?\s*" + re.escape(label) + r":\s*(.*)$", prompt, re.MULTILINE)
+    return match.group(1).strip() if match else ""
+
+
+class FakeLLM:
+    """Deterministic-content, randomised-latency stand-in for the provider"""
+
+    def __init__(self, latency=None, error_rate=0.0, malformed_rate=0.0, seed=None):
+        self.sample_latency = parse_latency_spec(latency or DEFAULT_LATENCY)
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()  # Called from several llm_executor threads
+        self.calls = 0
+        self.errors = 0
+        self.malformed = 0
+
+    @classmethod
+    def from_env(cls):
+        seed = os.environ.get("FAKE_LLM_SEED")
+        return cls(
+            latency=os.environ.get("FAKE_LLM_LATENCY", DEFAULT_LATENCY),
+            error_rate=float(os.environ.get("FAKE_LLM_ERROR_RATE", "0")),
+            malformed_rate=float(os.environ.get("FAKE_LLM_MALFORMED_RATE", "0")),
+            seed=int(seed) if seed else None
+        )
+
+    def complete(self, system_message: str, prompt: str) -> str:
+        """Blocking, like the real SDK call - sleeps for the sampled latency"""
+        with self._lock:
+            self.calls += 1
+            delay = self.sample_latency(self._rng)
+            fail = self._rng.random() < self.error_rate
+            malformed = not fail and self._rng.random() < self.malformed_rate
+            if fail:
+                self.errors += 1
+            if malformed:
+                self.malformed += 1
+
+        time.sleep(delay)
+        if fail:
+            raise FakeLLMError("Injected fake LLM failure")
+
+        response = self.respond(system_message, prompt)
+        if malformed:
+            return response[: max(1, len(response) // 2)]  # Cut mid-JSON
+        return response
+
+    def respond(self, system_message: str, prompt: str) -> str:
+        if "CANDIDATE PAIRS" in prompt:
+            return json.dumps(self._matching(prompt))
+        if "ADVISORY" in system_message:
+            return json.dumps(self._claim_analysis(prompt))
+        if "JSON array" in prompt or "JSON array" in system_message:
+            return json.dumps(self._questions(prompt))
+        return "OK"
+
+    def _matching(self, prompt: str) -> list:
+        lost = {item["id"]: item for item in _json_after("LOST ITEMS:", prompt)}
+        found = {item["id"]: item for item in _json_after("FOUND ITEMS:", prompt)}
+        matches = []
+        for lost_id, found_id in _json_after("CANDIDATE PAIRS [lost_id, found_id]:", prompt):
+            lost_item, found_item = lost.get(lost_id, {}), found.get(found_id, {})
+            text_a = f"{lost_item.get('keyword', '')} {lost_item.get('desc', '')}"
+            text_b = f"{found_item.get('keyword', '')} {found_item.get('desc', '')}"
+            confidence = round(min(100, 30 + 70 * _overlap(text_a, text_b) + 10 * _overlap(
+                lost_item.get("loc", ""), found_item.get("loc", "")
+            )))
+            if confidence >= 30:
+                matches.append({
+                    "lost_id": lost_id,
+                    "found_id": found_id,
+                    "confidence": confidence,
+                    "reason": "Fake LLM: keyword and description overlap"
+                })
+        return matches
+
+    def _questions(self, prompt: str) -> list:
+        subject = _prompt_field("Item", prompt) or "item"
+        variants = [
+            f"What colour and brand is your {subject}?",
+            f"Where exactly did you last have your {subject}?",
+            f"Describe one mark or sticker on your {subject} that a stranger would not notice.",
+            f"What was inside or attached to your {subject}?",
+            f"Roughly what time did you lose your {subject}?"
+        ]
+        start = _stable_int(prompt, len(variants))
+        return [variants[(start + offset) % len(variants)] for offset in range(3)]
+
+    def _claim_analysis(self, prompt: str) -> dict:
+        item_text = f"{_prompt_field('Item Type', prompt)} {_prompt_field('Description', prompt)}"
+        claim_text = " ".join(
+            _prompt_field(label, prompt)
+            for label in ("Claimed Product Type", "Claimant's Description", "Unique Marks Claimed")
+        )
+        score = round(min(100, 20 + 80 * _overlap(item_text, claim_text) + _stable_int(prompt, 10)))
+        return {
+            "internal_score": score,
+            "confidence_band": "HIGH" if score >= 80 else "MEDIUM" if score >= 60 else "LOW" if score >= 40 else "INSUFFICIENT",
+            "reasoning": "Fake LLM analysis based on word overlap between the claim and the item",
+            "what_matched": sorted(_words(item_text) & _words(claim_text))[:5],
+            "what_partially_matched": [],
+            "what_did_not_match": sorted(_words(claim_text) - _words(item_text))[:5],
+            "missing_information": [] if score >= 60 else ["Unique identifying marks"],
+            "inconsistencies": [],
+            "recommendation_for_admin": "Fake analysis - verify manually"
+        }
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "errors": self.errors, "malformed": self.malformed}
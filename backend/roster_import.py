@@ -0,0 +1,307 @@
+"""
+Roster import - vectorized validation of student Excel uploads.
+
+Every check runs as a whole-column pandas operation instead of a Python loop
+over df.iterrows(): header normalization, DOB parsing/format checks, email and
+phone sanity checks and within-file duplicate roll numbers. validate_roster()
+returns the clean rows as plain dicts plus one error frame, in a single pass.
+
+iter_roster_chunks() streams a workbook (openpyxl read-only mode) or CSV file as
+DataFrame chunks, so an import holds one chunk in memory however long the roster is.
+spool_roster() runs both in a worker process and hands compact chunks back via a spool file.
+"""
+
+import pickle
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+# Spreadsheet header -> student document field
+STUDENT_COLUMNS = {
+    "Roll Number": "roll_number",
+    "Full Name": "full_name",
+    "Department": "department",
+    "Year": "year",
+    "DOB": "dob",
+    "Email": "email",
+    "Phone Number": "phone_number",
+}
+
+DOB_FORMAT = "%d-%m-%Y"
+DOB_PATTERN = r"^\d{2}-\d{2}-\d{4}$"
+EMAIL_PATTERN = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+PHONE_DIGITS = (7, 15)  # Accepted digit count after stripping spaces, dashes, brackets and "+"
+
+ROSTER_EXTENSIONS = (".xlsx", ".xls", ".csv")
+DEFAULT_CHUNK_ROWS = 1000
+
+DUPLICATE_REASON = "duplicate in file"
+ERROR_COLUMNS = ["row", "roll_number", "reason", "message"]
+
+
+class RosterColumnsError(ValueError):
+    """The sheet is missing required columns - nothing can be imported"""
+
+    def __init__(self, missing):
+        self.missing = missing
+        super().__init__(f"Missing required columns: {', '.join(missing)}")
+
+    def __reduce__(self):
+        # Re-raised in the parent when spool_roster() fails inside the process pool
+        return (RosterColumnsError, (self.missing,))
+
+
+def normalize_columns(df: pd.DataFrame, required_columns, optional_columns=()) -> pd.DataFrame:
+    """
+    Match headers case- and whitespace-insensitively and rename them to student fields.
+    Raises RosterColumnsError listing the required headers that are absent.
+    """
+    by_key = {}
+    for column in df.columns:
+        by_key.setdefault(" ".join(str(column).split()).lower(), column)
+
+    missing = [column for column in required_columns if column.lower() not in by_key]
+    if missing:
+        raise RosterColumnsError(missing)
+
+    wanted = list(required_columns) + [column for column in optional_columns if column.lower() in by_key]
+    renamed = df[[by_key[column.lower()] for column in wanted]].copy()
+    renamed.columns = [STUDENT_COLUMNS[column] for column in wanted]
+    return renamed
+
+
+def as_text(series: pd.Series) -> pd.Series:
+    """
+    Cells as stripped strings, <NA> for blanks. Whole-number floats (Excel stores roll
+    and phone numbers as 21001.0) lose the ".0".
+    """
+    if pd.api.types.is_float_dtype(series):
+        values = series.to_numpy()
+        whole = np.isnan(values) | (values == np.floor(values))
+        if whole.all():
+            series = series.astype("Int64")
+    text = series.astype("string").str.strip()
+    if series.dtype == object:
+        # Mixed columns keep numeric cells as floats - "9876543210.0" -> "9876543210"
+        text = text.str.replace(r"^(\d+)\.0$", r"\1", regex=True)
+    return text.mask(text == "")
+
+
+def parse_dob(series: pd.Series) -> pd.Series:
+    """
+    DD-MM-YYYY strings, <NA> where the value is not a valid date. Text must match
+    DD-MM-YYYY and be a real calendar date; cells Excel typed as dates are reformatted.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime(DOB_FORMAT).astype("string")
+
+    text = as_text(series)
+    well_formed = text.str.match(DOB_PATTERN, na=False)
+    from_text = pd.to_datetime(text.where(well_formed), format=DOB_FORMAT, errors="coerce")
+    # Date cells in a mixed column arrive as datetime objects -> "YYYY-MM-DD HH:MM:SS"
+    from_cells = pd.to_datetime(text.where(~well_formed), format="%Y-%m-%d %H:%M:%S", errors="coerce")
+    return from_text.fillna(from_cells).dt.strftime(DOB_FORMAT).astype("string")
+
+
+def validate_roster(df: pd.DataFrame, required_columns, optional_columns=(), first_row_number=2):
+    """
+    Validate one sheet (or chunk of it). Rows are numbered from first_row_number, or taken
+    from the frame's index when it is None (chunks from iter_roster_chunks). Returns (records, errors):
+    records - list of dicts with the student fields plus "row" (spreadsheet row number)
+    errors  - DataFrame[row, roll_number, reason, message], the first problem per rejected row;
+              reason is DUPLICATE_REASON for repeated roll numbers, "invalid" otherwise
+    """
+    frame = normalize_columns(df, required_columns, optional_columns)
+    if first_row_number is None:
+        rows = pd.Series(frame.index, index=frame.index)
+    else:
+        rows = pd.Series(first_row_number + np.arange(len(frame)), index=frame.index)
+
+    clean = pd.DataFrame(index=frame.index)
+    for field in frame.columns:
+        clean[field] = parse_dob(frame[field]) if field == "dob" else as_text(frame[field])
+
+    message = pd.Series(pd.NA, index=frame.index, dtype="string")
+
+    def flag(mask, text):
+        # Keep the first problem found for each row
+        nonlocal message
+        message = message.mask(message.isna() & mask, text)
+
+    for column in required_columns:
+        field = STUDENT_COLUMNS[column]
+        if field != "dob":
+            flag(clean[field].isna(), f"Missing {column}")
+
+    raw_dob = as_text(frame["dob"]).fillna("")
+    flag(clean["dob"].isna(), "Invalid DOB format. Expected DD-MM-YYYY, got: " + raw_dob)
+
+    if "email" in clean:
+        flag(~clean["email"].str.match(EMAIL_PATTERN, na=True), "Invalid email: " + clean["email"].fillna(""))
+
+    if "phone_number" in clean:
+        digits = clean["phone_number"].str.replace(r"[\s\-()+.]", "", regex=True)
+        digit_count = digits.str.len()
+        bad_phone = ~digits.str.fullmatch(r"\d+", na=True) | (digit_count < PHONE_DIGITS[0]) | (digit_count > PHONE_DIGITS[1])
+        flag(bad_phone.fillna(False), "Invalid phone number: " + clean["phone_number"].fillna(""))
+
+    invalid = message.notna()
+    # Only valid rows claim a roll number - a broken first copy doesn't shadow a good second one
+    duplicate = ~invalid & clean["roll_number"].notna() & clean["roll_number"].where(~invalid).duplicated(keep="first")
+
+    errors = pd.DataFrame({
+        "row": rows,
+        "roll_number": clean["roll_number"],
+        "reason": np.where(duplicate, DUPLICATE_REASON, "invalid"),
+        "message": message.fillna("Duplicate roll number in file"),
+    })[invalid | duplicate]
+
+    accepted = clean[~invalid & ~duplicate].astype(object).where(clean[~invalid & ~duplicate].notna(), None)
+    accepted.insert(0, "row", rows[accepted.index])
+    records = accepted.to_dict("records")
+    return records, errors.reset_index(drop=True)[ERROR_COLUMNS]
+
+
+def error_messages(errors: pd.DataFrame) -> list:
+    """Invalid rows as the "Row N: message" strings the upload responses use"""
+    invalid = errors[errors["reason"] != DUPLICATE_REASON]
+    return [f"Row {row}: {message}" for row, message in zip(invalid["row"], invalid["message"])]
+
+
+def duplicate_skips(errors: pd.DataFrame) -> list:
+    """Within-file duplicates in the skipped_rows shape insert_students_bulk() reports"""
+    duplicates = errors[errors["reason"] == DUPLICATE_REASON]
+    return [
+        {"row": int(row), "roll_number": roll_number, "reason": DUPLICATE_REASON}
+        for row, roll_number in zip(duplicates["row"], duplicates["roll_number"])
+    ]
+
+
+# ===================== STREAMING READERS =====================
+
+def _row_frames(rows, chunk_rows: int):
+    """
+    DataFrames of up to chunk_rows rows from an iterator whose first item is the header.
+    Index = spreadsheet row number; fully blank rows are dropped but keep their numbers.
+    """
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = ["" if name is None else str(name) for name in header]
+    buffer, numbers = [], []
+    for row_number, values in enumerate(rows, start=2):
+        if all(value is None or (isinstance(value, str) and not value.strip()) for value in values):
+            continue
+        buffer.append(values)
+        numbers.append(row_number)
+        if len(buffer) == chunk_rows:
+            yield pd.DataFrame(buffer, columns=columns, index=numbers)
+            buffer, numbers = [], []
+    if buffer:
+        yield pd.DataFrame(buffer, columns=columns, index=numbers)
+
+def _xlsx_rows(path):
+    # read_only streams the sheet XML instead of building every cell object up front
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+def iter_roster_chunks(path, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """
+    Stream a roster file as DataFrame chunks indexed by spreadsheet row number - pass them
+    to validate_roster(chunk, ..., first_row_number=None). Yields nothing for a header-only file.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        # Everything as text - keeps leading zeros in roll and phone numbers
+        reader = pd.read_csv(path, dtype=str, keep_default_na=False, skip_blank_lines=False, chunksize=chunk_rows)
+        chunks = (chunk.set_axis(chunk.index + 2) for chunk in reader)
+        for chunk in chunks:
+            blank = chunk.apply(lambda column: column.fillna("").str.strip() == "").all(axis=1)
+            if not blank.all():
+                yield chunk[~blank]
+    elif suffix == ".xls":
+        # Legacy binary workbooks have no streaming reader - load once, hand out in chunks
+        df = pd.read_excel(path)
+        df.index = df.index + 2
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+    else:
+        yield from _row_frames(_xlsx_rows(path), chunk_rows)
+
+def read_roster_header(path) -> list:
+    """The file's header row without reading any data rows. [] for an empty file."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        try:
+            return list(pd.read_csv(path, dtype=str, nrows=0).columns)
+        except pd.errors.EmptyDataError:
+            return []
+    if suffix == ".xls":
+        return list(pd.read_excel(path, nrows=0).columns)
+    rows = _xlsx_rows(path)
+    try:
+        header = next(rows, None)
+    finally:
+        rows.close()
+    return [name for name in header or () if name is not None]
+
+def check_roster_header(path, required_columns):
+    """Raise RosterColumnsError before any chunk is read - header-only and empty files included"""
+    normalize_columns(pd.DataFrame(columns=read_roster_header(path)), required_columns)
+
+def estimate_roster_rows(path):
+    """Data rows for progress reporting, without reading the cells. None when unknown."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        with open(path, "rb") as f:
+            lines = sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b""))
+        return max(lines - 1, 0)
+    if suffix == ".xlsx":
+        workbook = load_workbook(path, read_only=True)
+        try:
+            max_row = workbook.active.max_row  # From the sheet's dimension tag
+        finally:
+            workbook.close()
+        return max(max_row - 1, 0) if max_row else None
+    return None
+
+
+# ===================== PROCESS POOL SPOOL =====================
+
+def spool_roster(path, spool_path, required_columns, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> dict:
+    """
+    Process-pool entry point: parse and validate the whole file, pickling one compact
+    (rows_in_chunk, fields, values, errors) tuple per chunk to spool_path so only a summary
+    crosses the process boundary. Returns {"rows", "chunks", "parse_seconds"}.
+    """
+    started = time.perf_counter()
+    # Checked up front - a file with no data rows yields no chunks for validate_roster() to check
+    check_roster_header(path, required_columns)
+    rows = chunks = 0
+    with open(spool_path, "wb") as spool:
+        for chunk in iter_roster_chunks(path, chunk_rows):
+            records, errors = validate_roster(chunk, required_columns, first_row_number=None)
+            fields = list(records[0]) if records else []
+            values = [tuple(record.values()) for record in records]
+            issues = list(errors.itertuples(index=False, name=None))
+            pickle.dump((len(chunk), fields, values, issues), spool, protocol=pickle.HIGHEST_PROTOCOL)
+            rows += len(chunk)
+            chunks += 1
+    return {"rows": rows, "chunks": chunks, "parse_seconds": round(time.perf_counter() - started, 3)}
+
+def read_spool(spool_path):
+    """Yield (rows_in_chunk, records, errors) back from a spool_roster() file, one chunk at a time"""
+    with open(spool_path, "rb") as spool:
+        while True:
+            try:
+                rows_in_chunk, fields, values, issues = pickle.load(spool)
+            except EOFError:
+                return
+            records = [dict(zip(fields, row)) for row in values]
+            yield rows_in_chunk, records, pd.DataFrame(issues, columns=ERROR_COLUMNS)
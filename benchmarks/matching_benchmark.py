@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Matching Benchmark - speed and quality of the lost/found matchers
+Runs each scorer over a synthetic corpus (see matching_corpus.py) and reports
+throughput, per-query p50/p99 latency, peak memory and precision/recall@k.
+Results are written as JSON so runs can be compared across commits.
+
+Usage:
+    python benchmarks/matching_benchmark.py --pairs 1000
+    python benchmarks/matching_benchmark.py --corpus corpus.json --scorers calculate_match_score
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+
+# server.py reads these at import time; the benchmark never talks to MongoDB
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "lost_found_benchmark")
+
+import server  # noqa: E402
+from matching_corpus import CorpusGenerator  # noqa: E402
+
+# Production threshold used by /ai/matches and match-on-create
+MATCH_THRESHOLD = server.MATCH_MIN_CONFIDENCE
+
+
+def score_match(lost_item, found_item):
+    return server.calculate_match_score(lost_item, found_item)["confidence"]
+
+
+def score_description_jaccard(lost_item, found_item):
+    """Baseline: word overlap of descriptions only"""
+    return server.calculate_text_similarity(lost_item.get("description", ""), found_item.get("description", ""))
+
+
+SCORERS = {
+    "calculate_match_score": score_match,
+    "description_jaccard": score_description_jaccard,
+}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def prepare_corpus(corpus):
+    """Apply the write-time enrichment create_item does (category_id)"""
+    for item in corpus["lost"] + corpus["found"]:
+        item["category_id"] = server.resolve_item_category(item["item_keyword"])
+    return corpus
+
+
+def candidate_lists(corpus, mode):
+    """Candidate found items per lost item - every found item, or the category block"""
+    found = corpus["found"]
+    if mode == "full":
+        return [(lost, found) for lost in corpus["lost"]]
+    blocks = server.group_items_by_category(found)
+    return [(lost, server.get_category_candidates(lost, blocks)) for lost in corpus["lost"]]
+
+
+def run_scorer(scorer, candidates):
+    """Rank candidates for every lost item; returns rankings and timing samples"""
+    rankings = {}
+    query_latencies = []
+    pairs_scored = 0
+    started = time.perf_counter()
+
+    for lost_item, found_items in candidates:
+        query_start = time.perf_counter()
+        scored = [(scorer(lost_item, found_item), found_item["id"]) for found_item in found_items]
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        query_latencies.append((time.perf_counter() - query_start) * 1000)
+        rankings[lost_item["id"]] = scored
+        pairs_scored += len(found_items)
+
+    elapsed = time.perf_counter() - started
+    return rankings, query_latencies, pairs_scored, elapsed
+
+
+def measure_peak_memory(scorer, candidates):
+    tracemalloc.start()
+    run_scorer(scorer, candidates)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def quality_metrics(rankings, truth, ks):
+    metrics = {}
+    queries = len(truth)
+    reciprocal_ranks = []
+
+    for lost_id, found_id in truth.items():
+        ranked_ids = [fid for _, fid in rankings.get(lost_id, [])]
+        rank = ranked_ids.index(found_id) + 1 if found_id in ranked_ids else None
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+
+    for k in ks:
+        hits = 0
+        for lost_id, found_id in truth.items():
+            top_ids = [fid for _, fid in rankings.get(lost_id, [])[:k]]
+            hits += found_id in top_ids
+        metrics[f"recall@{k}"] = round(hits / queries, 4) if queries else 0.0
+        # One relevant item per query, so precision@k is bounded by 1/k
+        metrics[f"precision@{k}"] = round(hits / (queries * k), 4) if queries else 0.0
+
+    # Quality at the production confidence threshold
+    true_pairs = set(truth.items())
+    predicted = {
+        (lost_id, fid)
+        for lost_id, ranked in rankings.items()
+        for score, fid in ranked
+        if score >= MATCH_THRESHOLD
+    }
+    correct = len(predicted & true_pairs)
+    metrics["threshold"] = MATCH_THRESHOLD
+    metrics["threshold_precision"] = round(correct / len(predicted), 4) if predicted else 0.0
+    metrics["threshold_recall"] = round(correct / len(true_pairs), 4) if true_pairs else 0.0
+    metrics["mrr"] = round(sum(reciprocal_ranks) / queries, 4) if queries else 0.0
+    return metrics
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lost/found matching speed and quality")
+    parser.add_argument("--corpus", help="Existing corpus JSON (default: generate one)")
+    parser.add_argument("--pairs", type=int, default=500)
+    parser.add_argument("--distractors", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scorers", default=",".join(SCORERS), help="Comma-separated scorer names")
+    parser.add_argument("--modes", default="full,blocked", help="full (all pairs) and/or blocked (category blocks)")
+    parser.add_argument("--k", default="1,5,10", help="Cut-offs for precision/recall@k")
+    parser.add_argument("--output", help="Result JSON path (default: benchmarks/results/matching-<timestamp>.json)")
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as f:
+            corpus = json.load(f)
+    else:
+        corpus = CorpusGenerator(seed=args.seed).generate(pairs=args.pairs, distractor_ratio=args.distractors)
+    corpus = prepare_corpus(corpus)
+
+    ks = [int(k) for k in args.k.split(",") if k]
+    scorer_names = [name for name in args.scorers.split(",") if name]
+    unknown = [name for name in scorer_names if name not in SCORERS]
+    if unknown:
+        print(f"❌ Unknown scorers: {', '.join(unknown)} (available: {', '.join(SCORERS)})")
+        return 1
+
+    print(f"📦 Corpus: {len(corpus['lost'])} lost, {len(corpus['found'])} found, {len(corpus['truth'])} true pairs")
+
+    results = []
+    for mode in [m for m in args.modes.split(",") if m]:
+        candidates = candidate_lists(corpus, mode)
+        for name in scorer_names:
+            scorer = SCORERS[name]
+            rankings, latencies, pairs_scored, elapsed = run_scorer(scorer, candidates)
+            peak_bytes = measure_peak_memory(scorer, candidates)
+
+            result = {
+                "scorer": name,
+                "mode": mode,
+                "queries": len(latencies),
+                "pairs_scored": pairs_scored,
+                "elapsed_seconds": round(elapsed, 4),
+                "throughput_pairs_per_second": round(pairs_scored / elapsed, 1) if elapsed else None,
+                "query_latency_ms": {
+                    "p50": round(percentile(latencies, 50), 4),
+                    "p99": round(percentile(latencies, 99), 4),
+                    "max": round(max(latencies), 4) if latencies else 0.0,
+                },
+                "peak_memory_kib": round(peak_bytes / 1024, 1),
+                "quality": quality_metrics(rankings, corpus["truth"], ks),
+            }
+            results.append(result)
+
+            quality = result["quality"]
+            print(
+                f"⏱️  {name:<24} {mode:<8} {result['throughput_pairs_per_second']:>12,.0f} pairs/s  "
+                f"p50 {result['query_latency_ms']['p50']:.3f} ms  p99 {result['query_latency_ms']['p99']:.3f} ms  "
+                f"R@1 {quality.get('recall@1', 0):.3f}  R@5 {quality.get('recall@5', 0):.3f}  "
+                f"MRR {quality['mrr']:.3f}"
+            )
+
+    report = {
+        "benchmark": "matching",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "corpus": corpus["meta"],
+        "results": results,
+    }
+
+    output = Path(args.output) if args.output else (
+        BENCH_DIR / "results" / f"matching-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Synthetic Lost & Found Corpus Generator
+Generates paired lost/found item reports that look like what students actually type:
+synonyms for the same object ("Mobile" vs "iPhone"), typos, Tanglish phrasing,
+missing details, nearby-but-different locations and a spread of report dates.
+Every lost item has exactly one true found counterpart; extra unpaired found
+items act as distractors.
+"""
+
+import argparse
+import json
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+# category -> keyword variants a student might type for the same object
+CATEGORY_KEYWORDS = {
+    "phone": ["Phone", "Mobile", "iPhone", "Smartphone", "mobile phone", "Cell phone", "Samsung"],
+    "laptop": ["Laptop", "MacBook", "laptop", "Chromebook", "ThinkPad"],
+    "earphones": ["Earphones", "Headphones", "AirPods", "earbuds", "Neckband"],
+    "charger": ["Charger", "Laptop charger", "Power bank", "Adapter", "USB cable"],
+    "watch": ["Watch", "Smartwatch", "Fitness band", "wrist watch"],
+    "wallet": ["Wallet", "Purse", "Card holder", "wallet"],
+    "bag": ["Bag", "Backpack", "College bag", "Sling bag", "Handbag"],
+    "keys": ["Keys", "Bike key", "Keychain", "Room key"],
+    "id_card": ["ID Card", "College ID", "Student ID", "id card"],
+    "books": ["Book", "Notebook", "Record note", "Textbook"],
+    "calculator": ["Calculator", "Scientific calculator", "Casio"],
+    "bottle": ["Water bottle", "Bottle", "Flask", "Sipper"],
+    "spectacles": ["Spectacles", "Glasses", "Specs", "Sunglasses"],
+    "jewellery": ["Jewellery", "Jewelry", "Gold chain", "Ring", "Bracelet", "Earrings"],
+    "umbrella": ["Umbrella"],
+}
+
+BRANDS = {
+    "phone": ["Samsung Galaxy M32", "Redmi Note 12", "iPhone 13", "OnePlus Nord", "Vivo Y21", "Realme Narzo"],
+    "laptop": ["Dell Inspiron", "HP Pavilion", "Lenovo IdeaPad", "Asus VivoBook", "MacBook Air"],
+    "earphones": ["boAt Airdopes", "JBL Tune", "Sony WH", "OnePlus Buds", "Realme Buds"],
+    "charger": ["65W Dell", "Mi 10000mAh", "Samsung 25W", "Apple 20W", "Ambrane"],
+    "watch": ["Noise ColorFit", "boAt Wave", "Titan", "Fastrack", "Casio"],
+    "wallet": ["Woodland", "Wildhorn", "leather", "Levi's", "handmade"],
+    "bag": ["Wildcraft", "American Tourister", "Skybags", "Puma", "F Gear"],
+    "keys": ["Honda Activa", "TVS Jupiter", "Godrej lock", "hostel room", "Hero Splendor"],
+    "id_card": ["SPCET", "college", "department", "library"],
+    "books": ["Engineering Mathematics", "Data Structures", "Physics record", "Classmate", "Digital Electronics"],
+    "calculator": ["Casio fx-991ES", "Casio fx-82MS", "Citizen", "Orpat"],
+    "bottle": ["Milton", "Cello", "steel", "Tupperware", "Borosil"],
+    "spectacles": ["Lenskart", "Ray-Ban", "Titan Eye+", "Vincent Chase"],
+    "jewellery": ["gold", "silver", "rose gold", "oxidised", "diamond stud"],
+    "umbrella": ["Popy", "John's", "foldable", "Citizen"],
+}
+
+COLORS = ["black", "white", "blue", "red", "grey", "silver", "green", "pink", "brown", "golden", "navy blue"]
+
+MARKS = [
+    "a crack on the top left corner", "a Pikachu sticker on the back", "my name written inside",
+    "a scratch near the camera", "a torn strap", "an engraved initial 'R'", "a faded logo",
+    "a dent on one side", "a custom cover with flowers", "a missing button", "tape around the edge",
+    "a small chip on the corner", "a keychain with a football", "a college hologram sticker",
+]
+
+LOCATIONS = {
+    "library": ["Library", "Central Library 1st floor", "library reading hall", "Library 2nd floor near racks"],
+    "canteen": ["Canteen", "Main canteen", "canteen near juice shop", "Cafeteria"],
+    "lab": ["CSE Lab 3", "Computer lab", "Physics lab", "ECE lab 2nd floor"],
+    "classroom": ["Classroom 204", "A block classroom", "Room 310", "classroom near staff room"],
+    "ground": ["Football ground", "Cricket ground", "ground near pavilion", "Basketball court ground"],
+    "parking": ["Two wheeler parking", "Bike parking", "Parking lot", "Staff parking"],
+    "gate": ["Main gate", "Back gate", "gate near security", "Entrance gate"],
+    "auditorium": ["Auditorium", "Main auditorium", "auditorium back rows", "Seminar hall near auditorium"],
+    "hostel": ["Boys hostel", "Girls hostel mess", "Hostel Block A", "hostel common room"],
+    "bus": ["College bus 12", "Bus stop", "bus near main gate", "Route 7 bus"],
+}
+
+TIMES = ["Morning (6 AM – 12 PM)", "Afternoon (12 PM – 4 PM)", "Evening (4 PM – 8 PM)", "Night (8 PM – 6 AM)"]
+
+LOST_TEMPLATES = [
+    "I lost my {color} {brand} {noun} with {mark}.",
+    "Lost {color} {brand} {noun}, it has {mark}. Please contact if found.",
+    "My {noun} is missing - {brand}, {color} colour, {mark}.",
+    "{color} {noun} ({brand}) lost. Identification: {mark}.",
+]
+
+FOUND_TEMPLATES = [
+    "Found a {color} {brand} {noun} with {mark}.",
+    "Someone left a {color} {noun} here, looks like {brand}. Has {mark}.",
+    "Found {noun}, {color}, {mark}. Handed over to security.",
+    "{color} {brand} {noun} found, {mark}.",
+]
+
+# Tanglish (Tamil + English) phrasing students commonly use
+TANGLISH_LOST = [
+    "En {color} {noun} kaanom da, {brand} model, {mark} irukku.",
+    "{noun} miss aayiduchu, {color} colour, {mark} irukum. Please help pannunga.",
+    "Naan {noun} ah {location_hint} la vittuten, {color} {brand}, {mark}.",
+]
+
+TANGLISH_FOUND = [
+    "Oru {color} {noun} kedachuchu, {mark} irukku.",
+    "{location_hint} la {color} {brand} {noun} kedandhuchu, yaarodadhu nu theriyala.",
+    "{noun} kandupidichen, {color} colour, {mark}.",
+]
+
+
+def add_typos(text: str, rng: random.Random, rate: float) -> str:
+    """Swap, drop or double letters in a fraction of the words"""
+    words = text.split()
+    for i, word in enumerate(words):
+        if len(word) < 4 or rng.random() >= rate:
+            continue
+        pos = rng.randrange(1, len(word) - 1)
+        kind = rng.choice(["swap", "drop", "double"])
+        if kind == "swap":
+            word = word[:pos - 1] + word[pos] + word[pos - 1] + word[pos + 1:]
+        elif kind == "drop":
+            word = word[:pos] + word[pos + 1:]
+        else:
+            word = word[:pos] + word[pos] + word[pos:]
+        words[i] = word
+    return " ".join(words)
+
+
+class CorpusGenerator:
+    def __init__(self, seed=42, typo_rate=0.08, tanglish_rate=0.2, synonym_rate=0.6,
+                 drop_detail_rate=0.25, location_noise_rate=0.3, max_day_gap=4):
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.typo_rate = typo_rate
+        self.tanglish_rate = tanglish_rate
+        self.synonym_rate = synonym_rate
+        self.drop_detail_rate = drop_detail_rate
+        self.location_noise_rate = location_noise_rate
+        self.max_day_gap = max_day_gap
+        self.base_date = datetime(2026, 1, 5)
+
+    def _item_id(self):
+        return str(uuid.UUID(int=self.rng.getrandbits(128)))
+
+    def _describe(self, templates, tanglish_templates, details, location_hint):
+        rng = self.rng
+        if rng.random() < self.tanglish_rate:
+            template = rng.choice(tanglish_templates)
+        else:
+            template = rng.choice(templates)
+
+        values = dict(details)
+        # Finders and owners rarely report the same set of details
+        if rng.random() < self.drop_detail_rate:
+            values["brand"] = ""
+        if rng.random() < self.drop_detail_rate:
+            values["mark"] = "no special marks"
+
+        text = template.format(location_hint=location_hint.lower(), **values)
+        text = " ".join(text.split())
+        text = text[0].upper() + text[1:]
+        return add_typos(text, rng, self.typo_rate)
+
+    def _object(self):
+        rng = self.rng
+        category = rng.choice(list(CATEGORY_KEYWORDS))
+        return {
+            "category": category,
+            "brand": rng.choice(BRANDS[category]),
+            "color": rng.choice(COLORS),
+            "mark": rng.choice(MARKS),
+            "area": rng.choice(list(LOCATIONS)),
+        }
+
+    def _report(self, item_type, obj, day, keyword):
+        rng = self.rng
+        area_names = LOCATIONS[obj["area"]]
+        location = rng.choice(area_names)
+        if rng.random() < self.location_noise_rate:
+            location = rng.choice(LOCATIONS[rng.choice(list(LOCATIONS))])
+
+        details = {"color": obj["color"], "brand": obj["brand"], "noun": keyword.lower(), "mark": obj["mark"]}
+        if item_type == "lost":
+            description = self._describe(LOST_TEMPLATES, TANGLISH_LOST, details, location)
+        else:
+            description = self._describe(FOUND_TEMPLATES, TANGLISH_FOUND, details, location)
+
+        created = self.base_date + timedelta(days=day)
+        return {
+            "id": self._item_id(),
+            "item_type": item_type,
+            "item_keyword": keyword,
+            "description": description,
+            "location": location,
+            "approximate_time": rng.choice(TIMES),
+            "student_id": self._item_id(),
+            "status": "reported",
+            "is_deleted": False,
+            "created_date": created.strftime("%Y-%m-%d"),
+            "created_at": created.isoformat(),
+            "_category": obj["category"],
+        }
+
+    def generate(self, pairs=500, distractor_ratio=1.0, days=60):
+        rng = self.rng
+        lost, found, truth = [], [], {}
+
+        for _ in range(pairs):
+            obj = self._object()
+            keywords = CATEGORY_KEYWORDS[obj["category"]]
+            lost_keyword = rng.choice(keywords)
+            found_keyword = rng.choice(keywords) if rng.random() < self.synonym_rate else lost_keyword
+
+            lost_day = rng.randrange(days)
+            found_day = lost_day + rng.randint(0, self.max_day_gap)
+
+            lost_item = self._report("lost", obj, lost_day, lost_keyword)
+            found_item = self._report("found", obj, found_day, found_keyword)
+            lost.append(lost_item)
+            found.append(found_item)
+            truth[lost_item["id"]] = found_item["id"]
+
+        # Unpaired found items - same categories and places, different objects
+        for _ in range(int(pairs * distractor_ratio)):
+            obj = self._object()
+            found.append(self._report("found", obj, rng.randrange(days + self.max_day_gap),
+                                      rng.choice(CATEGORY_KEYWORDS[obj["category"]])))
+
+        rng.shuffle(found)
+        return {
+            "meta": {
+                "seed": self.seed,
+                "pairs": pairs,
+                "distractors": len(found) - pairs,
+                "typo_rate": self.typo_rate,
+                "tanglish_rate": self.tanglish_rate,
+                "synonym_rate": self.synonym_rate,
+                "drop_detail_rate": self.drop_detail_rate,
+                "location_noise_rate": self.location_noise_rate,
+            },
+            "lost": lost,
+            "found": found,
+            "truth": truth,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic paired lost/found corpus")
+    parser.add_argument("--pairs", type=int, default=500, help="Number of true lost/found pairs")
+    parser.add_argument("--distractors", type=float, default=1.0, help="Unpaired found items per pair")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--typo-rate", type=float, default=0.08)
+    parser.add_argument("--tanglish-rate", type=float, default=0.2)
+    parser.add_argument("--output", default="-", help="Output JSON path (default: stdout)")
+    args = parser.parse_args()
+
+    corpus = CorpusGenerator(
+        seed=args.seed, typo_rate=args.typo_rate, tanglish_rate=args.tanglish_rate
+    ).generate(pairs=args.pairs, distractor_ratio=args.distractors)
+
+    if args.output == "-":
+        json.dump(corpus, sys.stdout, indent=2, ensure_ascii=False)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(corpus, f, indent=2, ensure_ascii=False)
+        print(f"✅ Wrote {len(corpus['lost'])} lost / {len(corpus['found'])} found items to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
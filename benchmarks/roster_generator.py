@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Synthetic Student Roster Generator
+Writes roster workbooks (.xlsx, streamed with openpyxl write-only mode) or CSVs of any
+size in the layout the upload endpoints expect, with realistic faults mixed in:
+malformed and impossible DOBs, repeated roll numbers, blank required cells, bad
+emails and phone numbers, and optionally whole missing columns.
+The same seed always produces the same base roster, so --change-rate can emit an
+"updated" copy of a roster for the sync-mode benchmark.
+"""
+
+import argparse
+import csv
+import json
+import random
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from openpyxl import Workbook
+
+COLUMNS = ["Roll Number", "Full Name", "Department", "Year", "DOB", "Email", "Phone Number"]
+# Columns a blank-cell fault may empty (Department/Year come from the folder on folder uploads)
+BLANKABLE_COLUMNS = ["Full Name", "DOB", "Email", "Phone Number"]
+
+FIRST_NAMES = [
+    "Arun", "Priya", "Karthik", "Divya", "Vignesh", "Keerthana", "Suresh", "Lakshmi", "Rahul",
+    "Nandhini", "Praveen", "Harini", "Ajith", "Swetha", "Manoj", "Gayathri", "Dinesh", "Sandhya",
+    "Sathish", "Aishwarya", "Gokul", "Janani", "Naveen", "Pavithra", "Vishal", "Deepika",
+]
+LAST_INITIALS = ["A", "B", "K", "M", "N", "P", "R", "S", "T", "V"]
+DEPARTMENTS = ["CSE", "ECE", "EEE", "MECH", "CIVIL", "IT", "AIDS"]
+BAD_DOBS = ["2003/05/14", "14.05.2003", "31-02-2003", "5-5-2003", "2003-05-14", "14-13-2003", "unknown"]
+BAD_EMAILS = ["student.gmail.com", "student@", "@college.edu", "student @gmail.com"]
+BAD_PHONES = ["98765", "call me", "98765432109876543"]
+
+
+class RosterGenerator:
+    def __init__(self, seed=42, bad_dob_rate=0.01, duplicate_rate=0.01, blank_rate=0.01,
+                 bad_contact_rate=0.01, date_cell_rate=0.1, change_rate=0.0):
+        self.seed = seed
+        self.bad_dob_rate = bad_dob_rate
+        self.duplicate_rate = duplicate_rate
+        self.blank_rate = blank_rate
+        self.bad_contact_rate = bad_contact_rate
+        self.date_cell_rate = date_cell_rate  # Share of DOBs written as real date cells (xlsx only)
+        self.change_rate = change_rate  # Share of rows whose email/phone differ from the base roster
+
+    def _student(self, index, rng):
+        department = DEPARTMENTS[index % len(DEPARTMENTS)]
+        dob = date(2002, 1, 1) + timedelta(days=rng.randrange(4 * 365))
+        first = rng.choice(FIRST_NAMES)
+        return {
+            "Roll Number": f"21{department}{index + 1:06d}",
+            "Full Name": f"{first} {rng.choice(LAST_INITIALS)}",
+            "Department": department,
+            "Year": str(1 + index % 4),
+            "DOB": dob,
+            "Email": f"{first.lower()}.{index + 1}@college.edu",
+            "Phone Number": str(rng.randrange(6000000000, 9999999999)),
+        }
+
+    def rows(self, count):
+        """
+        Yield (values, fault) pairs - fault is None for a clean row. Base rows come from a
+        per-row RNG so fault and change injection never shift the underlying roster.
+        """
+        fault_rng = random.Random(f"{self.seed}-faults")
+        change_rng = random.Random(f"{self.seed}-changes")
+        recent_rolls = []
+        for index in range(count):
+            student = self._student(index, random.Random(f"{self.seed}-{index}"))
+
+            if change_rng.random() < self.change_rate:
+                student["Email"] = student["Email"].replace("@college.edu", "@alumni.college.edu")
+                student["Phone Number"] = str(change_rng.randrange(6000000000, 9999999999))
+
+            fault = None
+            roll = fault_rng.random()
+            thresholds = [
+                ("duplicate", self.duplicate_rate),
+                ("bad_dob", self.bad_dob_rate),
+                ("blank", self.blank_rate),
+                ("bad_contact", self.bad_contact_rate),
+            ]
+            for name, rate in thresholds:
+                if roll < rate:
+                    fault = name
+                    break
+                roll -= rate
+
+            if fault == "duplicate" and recent_rolls:
+                student["Roll Number"] = fault_rng.choice(recent_rolls)
+            elif fault == "duplicate":
+                fault = None
+            elif fault == "bad_dob":
+                student["DOB"] = fault_rng.choice(BAD_DOBS)
+            elif fault == "blank":
+                student[fault_rng.choice(BLANKABLE_COLUMNS)] = None
+            elif fault == "bad_contact":
+                if fault_rng.random() < 0.5:
+                    student["Email"] = fault_rng.choice(BAD_EMAILS)
+                else:
+                    student["Phone Number"] = fault_rng.choice(BAD_PHONES)
+
+            recent_rolls.append(student["Roll Number"])
+            if len(recent_rolls) > 1000:
+                recent_rolls.pop(0)
+            yield student, fault
+
+    def _cell(self, column, value, rng, as_date_cells):
+        if column == "DOB" and isinstance(value, date):
+            if as_date_cells and rng.random() < self.date_cell_rate:
+                return datetime(value.year, value.month, value.day)
+            return value.strftime("%d-%m-%Y")
+        return value
+
+    def write(self, path, count, drop_columns=()):
+        """Write a roster to path (.xlsx or .csv) and return its metadata"""
+        path = Path(path)
+        columns = [column for column in COLUMNS if column not in drop_columns]
+        as_xlsx = path.suffix.lower() == ".xlsx"
+        cell_rng = random.Random(f"{self.seed}-cells")
+        faults = {"duplicate": 0, "bad_dob": 0, "blank": 0, "bad_contact": 0}
+
+        def lines():
+            for student, fault in self.rows(count):
+                if fault:
+                    faults[fault] += 1
+                yield [self._cell(column, student[column], cell_rng, as_xlsx) for column in columns]
+
+        if as_xlsx:
+            workbook = Workbook(write_only=True)  # Streams rows to disk - constant memory
+            sheet = workbook.create_sheet("Students")
+            sheet.append(columns)
+            for line in lines():
+                sheet.append(line)
+            workbook.save(path)
+        else:
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerows(["" if value is None else value for value in line] for line in lines())
+
+        return {
+            "path": str(path),
+            "format": path.suffix.lower().lstrip("."),
+            "rows": count,
+            "seed": self.seed,
+            "columns": columns,
+            "dropped_columns": list(drop_columns),
+            "injected_faults": faults,
+            "change_rate": self.change_rate,
+            "size_bytes": path.stat().st_size,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic student roster workbook or CSV")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--output", default="roster.xlsx", help="Output path - .xlsx or .csv")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--bad-dob-rate", type=float, default=0.01)
+    parser.add_argument("--duplicate-rate", type=float, default=0.01)
+    parser.add_argument("--blank-rate", type=float, default=0.01)
+    parser.add_argument("--bad-contact-rate", type=float, default=0.01)
+    parser.add_argument("--date-cell-rate", type=float, default=0.1, help="Share of DOBs stored as date cells (xlsx)")
+    parser.add_argument("--change-rate", type=float, default=0.0, help="Share of rows with a changed email/phone")
+    parser.add_argument("--drop-columns", default="", help="Comma-separated columns to leave out")
+    args = parser.parse_args()
+
+    generator = RosterGenerator(
+        seed=args.seed, bad_dob_rate=args.bad_dob_rate, duplicate_rate=args.duplicate_rate,
+        blank_rate=args.blank_rate, bad_contact_rate=args.bad_contact_rate,
+        date_cell_rate=args.date_cell_rate, change_rate=args.change_rate
+    )
+    drop_columns = [column for column in args.drop_columns.split(",") if column]
+    meta = generator.write(args.output, args.rows, drop_columns)
+    print(f"✅ Wrote {meta['rows']} rows ({meta['size_bytes'] / 1024:,.0f} KiB) to {meta['path']}")
+    print(json.dumps(meta["injected_faults"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Roster Import Benchmark - throughput, memory and database round trips of student uploads
+Generates rosters (see roster_generator.py) and runs them through the real import
+pipeline - process_roster_import() and, for sync runs, commit_roster_sync() - against a
+local MongoDB (--mongo-url) or an in-memory mongomock stand-in. Reports rows/s, parse and
+write time, peak RSS of the server process and the parse worker, and database operations
+per row. Results are written as JSON so runs can be compared across commits.
+
+Usage:
+    python benchmarks/roster_import_benchmark.py --rows 100000
+    python benchmarks/roster_import_benchmark.py --rows 20000 --formats csv --modes add,sync \\
+        --mongo-url mongodb://localhost:27017
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+
+# server.py reads these at import time; the database is swapped in per run below
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "roster_benchmark")
+
+from starlette.datastructures import UploadFile  # noqa: E402
+
+import server  # noqa: E402
+from roster_generator import RosterGenerator  # noqa: E402
+
+BENCH_USER = {"sub": "benchmark", "role": "super_admin"}
+BENCH_FOLDER = {
+    "department": "CSE",
+    "year": "1",
+    "department_folder_id": "benchmark-department",
+    "year_folder_id": "benchmark-year",
+}
+# Motor collection methods that cost one database round trip each
+DB_METHODS = {
+    "find", "find_one", "insert_one", "insert_many", "update_one", "update_many",
+    "bulk_write", "find_one_and_update", "count_documents", "delete_one", "delete_many",
+}
+
+
+class CountingCollection:
+    """Collection proxy counting every database call - a bulk call counts once"""
+
+    def __init__(self, collection, counts):
+        self._collection = collection
+        self._counts = counts
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name not in DB_METHODS:
+            return attr
+
+        def counted(*args, **kwargs):
+            self._counts[f"{self._collection.name}.{name}"] += 1
+            return attr(*args, **kwargs)
+        return counted
+
+
+class CountingDatabase:
+    def __init__(self, database):
+        self._database = database
+        self._collections = {}
+        self.counts = Counter()
+
+    def __getattr__(self, name):
+        if name not in self._collections:
+            self._collections[name] = CountingCollection(getattr(self._database, name), self.counts)
+        return self._collections[name]
+
+
+async def fresh_database(args):
+    """An empty database per run: the real server (--mongo-url) or mongomock"""
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_url)
+        await client.drop_database(args.db_name)
+        database = client[args.db_name]
+        # Production creates this at startup; mongomock's unique check is O(n) per insert, so it is skipped there
+        await database.students.create_index("roll_number", unique=True)
+        return database
+    from mongomock_motor import AsyncMongoMockClient
+    return AsyncMongoMockClient()[args.db_name]
+
+
+async def import_file(path: Path, mode: str) -> dict:
+    with open(path, "rb") as f:
+        job = await server.create_roster_import_job(
+            UploadFile(f, filename=path.name), BENCH_USER, mode=mode, **BENCH_FOLDER
+        )
+    await server.process_roster_import(job["id"])
+    if mode == "sync":
+        await server.commit_roster_sync(job["id"], BENCH_USER)
+    return await server.db.excel_uploads.find_one({"id": job["id"]}, {"_id": 0, "sync_preview": 0})
+
+
+async def run_import(args, path: Path, mode: str, baseline: Path = None) -> dict:
+    server.db = CountingDatabase(await fresh_database(args))
+    if baseline:
+        await import_file(baseline, "add")  # Sync runs reconcile against an already imported roster
+    server.db.counts.clear()
+    # Start the parse worker (spawn + pandas import) outside the timing, as a running server would have
+    pool = server.get_roster_process_pool()
+    await asyncio.get_running_loop().run_in_executor(pool, server.estimate_roster_rows, str(path))
+
+    started = time.perf_counter()
+    job = await import_file(path, mode)
+    elapsed = time.perf_counter() - started
+    # Wait for the worker to exit - RUSAGE_CHILDREN only covers reaped processes
+    pool.shutdown(wait=True)
+    server._roster_process_pool = None
+
+    counts = dict(server.db.counts)
+    total_ops = sum(counts.values())
+    student_ops = sum(count for key, count in counts.items() if key.startswith("students."))
+    rows = job["total_rows"] or 0
+    return {
+        "status": job["status"],
+        "rows": rows,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed else None,
+        "throughput": job.get("throughput"),
+        "students_added": job["students_added"],
+        "students_updated": job.get("students_updated"),
+        "students_skipped": job["students_skipped"],
+        "error_rows": len(job["errors"]),
+        "sync_summary": job.get("sync_summary"),
+        "db_operations": counts,
+        "db_ops_per_row": round(total_ops / rows, 4) if rows else None,
+        "student_db_ops_per_row": round(student_ops / rows, 4) if rows else None,
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "parse_worker_max_rss_kib": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+async def run(args, workdir: Path):
+    formats = [fmt for fmt in args.formats.split(",") if fmt]
+    modes = [mode for mode in args.modes.split(",") if mode]
+    generator_options = dict(
+        seed=args.seed, bad_dob_rate=args.bad_dob_rate, duplicate_rate=args.duplicate_rate,
+        blank_rate=args.blank_rate, bad_contact_rate=args.bad_contact_rate
+    )
+
+    results = []
+    for fmt in formats:
+        path = workdir / f"roster-{args.rows}.{fmt}"
+        generated = time.perf_counter()
+        roster = RosterGenerator(**generator_options).write(path, args.rows)
+        print(f"📦 {fmt}: {args.rows:,} rows, {roster['size_bytes'] / 1024:,.0f} KiB "
+              f"(generated in {time.perf_counter() - generated:.1f} s), faults {roster['injected_faults']}")
+
+        for mode in modes:
+            source, baseline = path, None
+            if mode == "sync":
+                source = workdir / f"roster-{args.rows}-changed.{fmt}"
+                RosterGenerator(**generator_options, change_rate=args.change_rate).write(source, args.rows)
+                baseline = path
+            result = {"format": fmt, "mode": mode, "roster": roster, **await run_import(args, source, mode, baseline)}
+            results.append(result)
+            print(
+                f"⏱️  {fmt:<5} {mode:<5} {result['rows_per_second'] or 0:>10,.0f} rows/s  "
+                f"{result['elapsed_seconds']:>7.2f} s  added {result['students_added']:,}  "
+                f"updated {result['students_updated'] or 0:,}  "
+                f"skipped {result['students_skipped']:,}  errors {result['error_rows']:,}  "
+                f"{result['db_ops_per_row']} db ops/row  RSS {result['max_rss_kib'] / 1024:,.0f} MiB "
+                f"(parse worker {result['parse_worker_max_rss_kib'] / 1024:,.0f} MiB)"
+            )
+
+    if args.check_missing_columns:
+        path = workdir / "roster-missing-email.csv"
+        RosterGenerator(**generator_options).write(path, 1000, drop_columns=["Email"])
+        result = {"format": "csv", "mode": "missing_columns", **await run_import(args, path, "add")}
+        results.append(result)
+        print(f"⏱️  missing column: {result['status']} in {result['elapsed_seconds']:.2f} s")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark roster (student Excel/CSV) import")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--formats", default="xlsx,csv", help="Comma-separated: xlsx, csv")
+    parser.add_argument("--modes", default="add,sync", help="add (insert new) and/or sync (diff + commit)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--bad-dob-rate", type=float, default=0.01)
+    parser.add_argument("--duplicate-rate", type=float, default=0.01)
+    parser.add_argument("--blank-rate", type=float, default=0.01)
+    parser.add_argument("--bad-contact-rate", type=float, default=0.01)
+    parser.add_argument("--change-rate", type=float, default=0.05, help="Changed rows in the sync-mode roster")
+    parser.add_argument("--no-missing-columns", dest="check_missing_columns", action="store_false",
+                        help="Skip the missing-column rejection check")
+    parser.add_argument("--mongo-url", help="Benchmark against this MongoDB (default: in-memory mongomock)")
+    parser.add_argument("--db-name", default="roster_benchmark", help="Dropped and recreated for every run")
+    parser.add_argument("--workdir", help="Where generated rosters go (default: a temporary directory)")
+    parser.add_argument("--output", help="Result JSON path (default: benchmarks/results/roster-import-<timestamp>.json)")
+    args = parser.parse_args()
+
+    if not args.mongo_url:
+        try:
+            import mongomock_motor  # noqa: F401
+        except ImportError:
+            print("❌ mongomock-motor is not installed - pip install mongomock-motor, or pass --mongo-url")
+            return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(args.workdir) if args.workdir else Path(tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+        results = asyncio.run(run(args, workdir))
+
+    report = {
+        "benchmark": "roster_import",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": "mongodb" if args.mongo_url else "mongomock",
+        "chunk_rows": server.ROSTER_IMPORT_CHUNK_ROWS,
+        "parse_processes": server.ROSTER_PARSE_PROCESSES,
+        "results": results,
+    }
+
+    output = Path(args.output) if args.output else (
+        BENCH_DIR / "results" / f"roster-import-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
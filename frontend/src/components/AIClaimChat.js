@@ -109,7 +109,8 @@ const AIClaimChat = () => {
           item_keyword: itemKeyword,
           description: description,
           location: location,
-          secret_message: secretMessage
+          secret_message: secretMessage,
+          item_id: itemData?.id
         },
         { headers: { Authorization: `Bearer ${authToken}` } }
       );
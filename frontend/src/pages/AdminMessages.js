@@ -24,14 +24,17 @@ import {
   DialogFooter,
 } from '../components/ui/dialog';
 import { toast } from 'sonner';
-import { MessageSquare, Send, Mail, MailOpen, Users, Edit2, Trash2, ThumbsUp, ThumbsDown, ArrowLeft, Eye, EyeOff } from 'lucide-react';
+import { MessageSquare, Send, Users, Edit2, Trash2, ThumbsUp, ThumbsDown, ArrowLeft, Eye, EyeOff, ChevronRight } from 'lucide-react';
 import { format } from 'date-fns';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 
 const AdminMessages = () => {
   const navigate = useNavigate();
-  const [messages, setMessages] = useState([]);
+  const [conversations, setConversations] = useState([]);
+  const [nextBefore, setNextBefore] = useState(null);
+  const [openId, setOpenId] = useState(null);
+  const [threads, setThreads] = useState({});
   const [students, setStudents] = useState([]);
   const [loading, setLoading] = useState(true);
   const [showComposeDialog, setShowComposeDialog] = useState(false);
@@ -48,11 +51,12 @@ const AdminMessages = () => {
 
   const fetchData = async () => {
     try {
-      const [messagesRes, studentsRes] = await Promise.all([
-        messagesAPI.getMessages(),
+      const [conversationsRes, studentsRes] = await Promise.all([
+        messagesAPI.getConversations(),
         studentsAPI.getStudents()
       ]);
-      setMessages(messagesRes.data);
+      setConversations(conversationsRes.data.conversations);
+      setNextBefore(conversationsRes.data.next_before);
       setStudents(studentsRes.data);
     } catch (error) {
       console.error('Failed to fetch data:', error);
@@ -62,6 +66,46 @@ const AdminMessages = () => {
     }
   };
 
+  const fetchMoreConversations = async () => {
+    try {
+      const response = await messagesAPI.getConversations(nextBefore);
+      setConversations(prev => [...prev, ...response.data.conversations]);
+      setNextBefore(response.data.next_before);
+    } catch (error) {
+      toast.error('Failed to load conversations');
+    }
+  };
+
+  const fetchThread = async (conversationId, before) => {
+    try {
+      const response = await messagesAPI.getConversationMessages(conversationId, before);
+      setThreads(prev => ({
+        ...prev,
+        [conversationId]: {
+          messages: before ? [...(prev[conversationId]?.messages || []), ...response.data.messages] : response.data.messages,
+          nextBefore: response.data.next_before
+        }
+      }));
+    } catch (error) {
+      toast.error('Failed to load messages');
+    }
+  };
+
+  const toggleConversation = (conversationId) => {
+    if (openId === conversationId) {
+      setOpenId(null);
+      return;
+    }
+    setOpenId(conversationId);
+    fetchThread(conversationId);
+  };
+
+  // Reload the inbox and the open thread after a change
+  const refresh = () => {
+    fetchData();
+    if (openId) fetchThread(openId);
+  };
+
   const handleSendMessage = async () => {
     if (!selectedStudent || !messageContent.trim()) {
       toast.error('Please select a student and enter a message');
@@ -75,7 +119,7 @@ const AdminMessages = () => {
       setShowComposeDialog(false);
       setSelectedStudent('');
       setMessageContent('');
-      fetchData();
+      refresh();
     } catch (error) {
       toast.error('Failed to send message');
     } finally {
@@ -100,7 +144,7 @@ const AdminMessages = () => {
       setShowEditDialog(false);
       setEditingMessage(null);
       setEditContent('');
-      fetchData();
+      refresh();
     } catch (error) {
       toast.error('Failed to update message');
     }
@@ -115,20 +159,16 @@ const AdminMessages = () => {
         headers: { Authorization: `Bearer ${token}` }
       });
       toast.success('Message deleted successfully');
-      fetchData();
+      refresh();
     } catch (error) {
       toast.error('Failed to delete message');
     }
   };
 
-  const groupedMessages = messages.reduce((acc, msg) => {
-    const recipientId = msg.recipient_id;
-    if (!acc[recipientId]) {
-      acc[recipientId] = [];
-    }
-    acc[recipientId].push(msg);
-    return acc;
-  }, {});
+  const participantName = (conversation, participantId) => {
+    if (participantId !== conversation.counterpart?.id) return 'You';
+    return conversation.counterpart?.full_name || conversation.counterpart?.username || 'Unknown Student';
+  };
 
   const getReactionIcon = (reaction) => {
     if (reaction === 'thumbs_up') return <ThumbsUp className="w-4 h-4 text-green-600" />;
@@ -167,7 +207,7 @@ const AdminMessages = () => {
         </div>
       ) : (
         <div className="grid gap-6">
-          {Object.keys(groupedMessages).length === 0 ? (
+          {conversations.length === 0 ? (
             <Card>
               <CardContent className="p-12 text-center">
                 <MessageSquare className="w-16 h-16 mx-auto text-slate-300 mb-4" />
@@ -175,117 +215,150 @@ const AdminMessages = () => {
               </CardContent>
             </Card>
           ) : (
-            Object.keys(groupedMessages).map((recipientId) => {
-              const recipientMessages = groupedMessages[recipientId];
-              const firstMessage = recipientMessages[0];
-              const recipient = firstMessage.recipient;
+            conversations.map((conversation) => {
+              const isOpen = openId === conversation.id;
+              const thread = threads[conversation.id];
 
               return (
-                <Card key={recipientId}>
-                  <CardHeader>
+                <Card key={conversation.id}>
+                  <CardHeader className="cursor-pointer" onClick={() => toggleConversation(conversation.id)}>
                     <div className="flex items-center justify-between">
                       <CardTitle className="flex items-center gap-2">
                         <Users className="w-5 h-5 text-blue-600" />
-                        Conversation with {recipient?.full_name || 'Unknown Student'}
+                        Conversation with {participantName(conversation, conversation.counterpart?.id)}
                       </CardTitle>
-                      <Badge variant="outline">
-                        {recipientMessages.length} message{recipientMessages.length !== 1 ? 's' : ''}
-                      </Badge>
+                      <div className="flex items-center gap-2">
+                        {conversation.unread_count > 0 && (
+                          <Badge className="bg-blue-600">{conversation.unread_count} new</Badge>
+                        )}
+                        <Badge variant="outline">
+                          {conversation.message_count} message{conversation.message_count !== 1 ? 's' : ''}
+                        </Badge>
+                        <ChevronRight className={`w-4 h-4 text-slate-400 transition-transform ${isOpen ? 'rotate-90' : ''}`} />
+                      </div>
                     </div>
+                    {!isOpen && (
+                      <p className="text-sm text-slate-600 truncate">
+                        {conversation.last_message?.content}
+                        <span className="text-xs text-slate-400 ml-2">
+                          {format(new Date(conversation.last_message_at), 'PPp')}
+                        </span>
+                      </p>
+                    )}
                   </CardHeader>
-                  <CardContent className="space-y-3">
-                    {recipientMessages.map((msg) => (
-                      <div
-                        key={msg.id}
-                        className="border rounded-lg p-4 space-y-3"
-                      >
-                        {/* Message Header */}
-                        <div className="flex items-start justify-between">
-                          <div className="flex-1">
-                            <div className="flex items-center gap-2 mb-1">
-                              <span className="text-sm font-semibold text-slate-700">
-                                From: {msg.sender?.full_name || msg.sender?.username || 'Admin'}
-                              </span>
-                              <span className="text-xs text-slate-500">→</span>
-                              <span className="text-sm font-semibold text-slate-700">
-                                To: {msg.recipient?.full_name || 'Student'}
-                              </span>
-                            </div>
-                            <p className="text-xs text-slate-500">
-                              {format(new Date(msg.created_at), 'PPp')}
-                              {msg.updated_at && ' (edited)'}
-                            </p>
-                          </div>
-                          
-                          {/* Admin Actions */}
-                          <div className="flex items-center gap-2">
-                            <Button
-                              size="sm"
-                              variant="ghost"
-                              onClick={() => {
-                                setEditingMessage(msg);
-                                setEditContent(msg.content);
-                                setShowEditDialog(true);
-                              }}
-                            >
-                              <Edit2 className="w-4 h-4" />
-                            </Button>
-                            <Button
-                              size="sm"
-                              variant="ghost"
-                              onClick={() => handleDeleteMessage(msg.id)}
-                            >
-                              <Trash2 className="w-4 h-4 text-red-600" />
-                            </Button>
-                          </div>
+                  {isOpen && (
+                    <CardContent className="space-y-3">
+                      {!thread ? (
+                        <div className="flex justify-center py-4">
+                          <div className="spinner" />
                         </div>
+                      ) : (
+                        <>
+                          {thread.messages.map((msg) => (
+                            <div
+                              key={msg.id}
+                              className="border rounded-lg p-4 space-y-3"
+                            >
+                              {/* Message Header */}
+                              <div className="flex items-start justify-between">
+                                <div className="flex-1">
+                                  <div className="flex items-center gap-2 mb-1">
+                                    <span className="text-sm font-semibold text-slate-700">
+                                      From: {participantName(conversation, msg.sender_id)}
+                                    </span>
+                                    <span className="text-xs text-slate-500">→</span>
+                                    <span className="text-sm font-semibold text-slate-700">
+                                      To: {participantName(conversation, msg.recipient_id)}
+                                    </span>
+                                  </div>
+                                  <p className="text-xs text-slate-500">
+                                    {format(new Date(msg.created_at), 'PPp')}
+                                    {msg.updated_at && ' (edited)'}
+                                  </p>
+                                </div>
+                          
+                                {/* Admin Actions */}
+                                <div className="flex items-center gap-2">
+                                  <Button
+                                    size="sm"
+                                    variant="ghost"
+                                    onClick={() => {
+                                      setEditingMessage(msg);
+                                      setEditContent(msg.content);
+                                      setShowEditDialog(true);
+                                    }}
+                                  >
+                                    <Edit2 className="w-4 h-4" />
+                                  </Button>
+                                  <Button
+                                    size="sm"
+                                    variant="ghost"
+                                    onClick={() => handleDeleteMessage(msg.id)}
+                                  >
+                                    <Trash2 className="w-4 h-4 text-red-600" />
+                                  </Button>
+                                </div>
+                              </div>
 
-                        {/* Message Content */}
-                        <p className="text-sm text-slate-800 bg-slate-50 rounded p-3">
-                          {msg.content}
-                        </p>
+                              {/* Message Content */}
+                              <p className="text-sm text-slate-800 bg-slate-50 rounded p-3">
+                                {msg.content}
+                              </p>
 
-                        {/* Message Status & Reactions - FIX #4: Show seen_at timestamp */}
-                        <div className="flex items-center gap-4 text-xs">
-                          {/* Seen Status with Timestamp */}
-                          <div className="flex items-center gap-1">
-                            {msg.is_read ? (
-                              <>
-                                <Eye className="w-3.5 h-3.5 text-green-600" />
-                                <span className="text-green-600 font-medium">
-                                  Seen {msg.seen_at && (
-                                    <span className="font-normal">
-                                      • {format(new Date(msg.seen_at), 'MMM d, h:mm a')}
-                                    </span>
+                              {/* Message Status & Reactions - FIX #4: Show seen_at timestamp */}
+                              <div className="flex items-center gap-4 text-xs">
+                                {/* Seen Status with Timestamp */}
+                                <div className="flex items-center gap-1">
+                                  {msg.is_read ? (
+                                    <>
+                                      <Eye className="w-3.5 h-3.5 text-green-600" />
+                                      <span className="text-green-600 font-medium">
+                                        Seen {msg.seen_at && (
+                                          <span className="font-normal">
+                                            • {format(new Date(msg.seen_at), 'MMM d, h:mm a')}
+                                          </span>
+                                        )}
+                                      </span>
+                                    </>
+                                  ) : (
+                                    <>
+                                      <EyeOff className="w-3.5 h-3.5 text-slate-400" />
+                                      <span className="text-slate-500">Not Seen</span>
+                                    </>
                                   )}
-                                </span>
-                              </>
-                            ) : (
-                              <>
-                                <EyeOff className="w-3.5 h-3.5 text-slate-400" />
-                                <span className="text-slate-500">Not Seen</span>
-                              </>
-                            )}
-                          </div>
+                                </div>
 
-                          {/* Student Reaction */}
-                          {msg.student_reaction && (
-                            <div className="flex items-center gap-1 px-2 py-1 bg-slate-100 rounded">
-                              <span className="text-slate-600">Student reacted:</span>
-                              {getReactionIcon(msg.student_reaction)}
-                              <span className="font-medium">
-                                {msg.student_reaction === 'thumbs_up' ? 'Thumbs Up' : 'Thumbs Down'}
-                              </span>
+                                {/* Student Reaction */}
+                                {msg.student_reaction && (
+                                  <div className="flex items-center gap-1 px-2 py-1 bg-slate-100 rounded">
+                                    <span className="text-slate-600">Student reacted:</span>
+                                    {getReactionIcon(msg.student_reaction)}
+                                    <span className="font-medium">
+                                      {msg.student_reaction === 'thumbs_up' ? 'Thumbs Up' : 'Thumbs Down'}
+                                    </span>
+                                  </div>
+                                )}
+                              </div>
                             </div>
+                          ))}
+                          {thread.nextBefore && (
+                            <Button variant="outline" size="sm" className="w-full" onClick={() => fetchThread(conversation.id, thread.nextBefore)}>
+                              Load older messages
+                            </Button>
                           )}
-                        </div>
-                      </div>
-                    ))}
-                  </CardContent>
+                        </>
+                      )}
+                    </CardContent>
+                  )}
                 </Card>
               );
             })
           )}
+          {nextBefore && (
+            <Button variant="outline" className="w-full" onClick={fetchMoreConversations}>
+              Load more conversations
+            </Button>
+          )}
         </div>
       )}
 
@@ -60,6 +60,7 @@ const AdminStudents = () => {
   const [folderToDelete, setFolderToDelete] = useState(null);
   const [excelFile, setExcelFile] = useState(null);
   const [uploadYearFolderId, setUploadYearFolderId] = useState('');
+  const [syncMode, setSyncMode] = useState(false);
 
   useEffect(() => {
     fetchStudents();
@@ -209,6 +210,70 @@ const AdminStudents = () => {
     }
   };
 
+  // Roster uploads are imported in the background - poll the job until it finishes
+  const waitForRosterImport = async (jobId) => {
+    const toastId = toast.loading('Importing students...');
+    try {
+      while (true) {
+        await new Promise((resolve) => setTimeout(resolve, 1500));
+        const { data: job } = await studentsAPI.getRosterImport(jobId);
+        if (['completed', 'failed', 'preview_ready'].includes(job.status)) {
+          return job;
+        }
+        if (job.total_rows) {
+          toast.loading(`Importing students... ${job.rows_done}/${job.total_rows} rows`, { id: toastId });
+        }
+      }
+    } finally {
+      toast.dismiss(toastId);
+    }
+  };
+
+  // Rows are checked one by one, but a file without a required column can't be read at all
+  const rosterFailureMessage = (message) => {
+    if (message && message.startsWith('Missing required columns') && /Email|Phone Number/.test(message)) {
+      return `${message}. Every row needs an Email and Phone Number - add the missing columns to your roster file and upload again.`;
+    }
+    return message || 'Import failed';
+  };
+
+  const reportRosterImport = (job) => {
+    if (job.status === 'failed') {
+      toast.error(rosterFailureMessage(job.errors[job.errors.length - 1]));
+      return;
+    }
+    const rate = job.throughput?.rows_per_second ? ` (${Math.round(job.throughput.rows_per_second)} rows/s)` : '';
+    const updated = job.students_updated !== undefined ? `, Updated: ${job.students_updated}` : '';
+    const summary = `Upload complete. Added: ${job.students_added}${updated}, Skipped: ${job.students_skipped}${rate}`;
+    // errors only lists the first few hundred - error_count is the total
+    const errorCount = job.error_count ?? job.errors.length;
+    if (errorCount > 0) {
+      toast.warning(`${summary}, Errors: ${errorCount}`);
+    } else {
+      toast.success(summary);
+    }
+  };
+
+  // Sync mode: show the diff and apply it only once the admin confirms
+  const confirmRosterSync = async (job) => {
+    const { add, update, missing, unchanged } = job.sync_summary;
+    const confirmed = window.confirm(
+      `Sync preview for ${job.filename}:\n` +
+      `• ${add} new students will be added\n` +
+      `• ${update} students will be updated\n` +
+      `• ${unchanged} unchanged\n` +
+      `• ${missing} students in this folder are not in the file (they will NOT be deleted)\n` +
+      `• ${job.students_skipped} rows skipped, ${job.error_count ?? job.errors.length} rows with errors\n\n` +
+      'Apply these changes?'
+    );
+    if (!confirmed) {
+      toast.info('Sync cancelled - no changes were made');
+      return null;
+    }
+    const { data } = await studentsAPI.commitRosterImport(job.id);
+    return data;
+  };
+
   const uploadExcelToFolder = async () => {
     if (!excelFile || !uploadYearFolderId) {
       toast.error('Please select a year folder and Excel file');
@@ -219,6 +284,7 @@ const AdminStudents = () => {
       const token = localStorage.getItem('token');
       const formData = new FormData();
       formData.append('file', excelFile);
+      formData.append('mode', syncMode ? 'sync' : 'add');
 
       const response = await axios.post(`${API}/folders/${uploadYearFolderId}/upload-excel`, formData, {
         headers: { 
@@ -227,9 +293,14 @@ const AdminStudents = () => {
         }
       });
 
-      toast.success(response.data.message);
       setExcelFile(null);
       setUploadFolderDialogOpen(false);
+      let job = await waitForRosterImport(response.data.job_id);
+      if (job.status === 'preview_ready') {
+        job = await confirmRosterSync(job);
+        if (!job) return;
+      }
+      reportRosterImport(job);
       fetchStudents();
       if (selectedFolderId) {
         fetchFolderDetails(selectedFolderId);
@@ -244,17 +315,17 @@ const AdminStudents = () => {
     const file = e.target.files[0];
     if (!file) return;
 
-    if (!file.name.endsWith('.xlsx') && !file.name.endsWith('.xls')) {
-      toast.error('Please upload an Excel file (.xlsx or .xls)');
+    if (!/\.(xlsx|xls|csv)$/i.test(file.name)) {
+      toast.error('Please upload an Excel or CSV file (.xlsx, .xls or .csv)');
       return;
     }
 
     setUploading(true);
     try {
       const response = await studentsAPI.uploadExcel(file);
-      toast.success(response.data.message);
-      fetchStudents();
       setShowUploadDialog(false);
+      reportRosterImport(await waitForRosterImport(response.data.job_id));
+      fetchStudents();
     } catch (error) {
       const message = error.response?.data?.detail || 'Upload failed';
       toast.error(message);
@@ -317,18 +388,19 @@ const AdminStudents = () => {
                 <DialogHeader>
                   <DialogTitle>Upload Students Excel</DialogTitle>
                   <DialogDescription>
-                    Upload an Excel file with student data
+                    Upload an Excel or CSV file with student data
                   </DialogDescription>
                 </DialogHeader>
                 <div className="space-y-4">
                   <Input
                     type="file"
-                    accept=".xlsx,.xls"
+                    accept=".xlsx,.xls,.csv"
                     onChange={handleUploadExcel}
                     disabled={uploading}
                   />
                   <p className="text-xs text-slate-500">
                     Required columns: Roll Number, Full Name, Department, Year, DOB, Email, Phone Number
+                    (rows with a blank or invalid Email or Phone Number are skipped and listed in the error report)
                   </p>
                 </div>
               </DialogContent>
@@ -757,16 +829,29 @@ const AdminStudents = () => {
           </DialogHeader>
           <div className="space-y-4">
             <div>
-              <Label>Excel File</Label>
+              <Label>Excel or CSV File</Label>
               <Input
                 type="file"
-                accept=".xlsx,.xls"
+                accept=".xlsx,.xls,.csv"
                 onChange={(e) => setExcelFile(e.target.files[0])}
               />
               <p className="text-xs text-slate-500 mt-1">
                 Required: Roll Number, Full Name, DOB, Email, Phone Number
+                (rows with a blank or invalid Email or Phone Number are skipped and listed in the error report)
               </p>
             </div>
+            <div className="flex items-center gap-2">
+              <input
+                type="checkbox"
+                id="sync_mode"
+                checked={syncMode}
+                onChange={(e) => setSyncMode(e.target.checked)}
+                className="rounded border-slate-300"
+              />
+              <Label htmlFor="sync_mode" className="text-sm cursor-pointer">
+                Sync mode - also update changed names, DOBs, emails and phones (preview before applying)
+              </Label>
+            </div>
           </div>
           <DialogFooter>
             <Button onClick={uploadExcelToFolder}>Upload</Button>
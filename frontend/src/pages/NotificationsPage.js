@@ -6,42 +6,73 @@ import { Card, CardContent } from '../components/ui/card';
 import { Button } from '../components/ui/button';
 import { Badge } from '../components/ui/badge';
 import { toast } from 'sonner';
-import { Bell, Mail, MailOpen, ThumbsUp, ThumbsDown, Eye } from 'lucide-react';
+import { Bell, MailOpen, ThumbsUp, ThumbsDown, ChevronRight } from 'lucide-react';
 import { format } from 'date-fns';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 
 /**
  * NotificationsPage
- * FIX B: Messages are automatically marked as "seen" when viewed.
+ * The inbox lists conversations (one per sender, incl. system notifications) with their
+ * last message and unread count. Opening a conversation loads its history a page at a time.
+ * FIX B: Messages are automatically marked as "seen" when their conversation is opened.
  * No manual "Mark as Read" button - just like real messaging apps.
  */
 const NotificationsPage = () => {
   const { refreshUnread } = useOutletContext();
-  const [messages, setMessages] = useState([]);
+  const [conversations, setConversations] = useState([]);
+  const [nextBefore, setNextBefore] = useState(null);
+  const [openId, setOpenId] = useState(null);
+  const [threads, setThreads] = useState({});
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    fetchMessages();
+    fetchConversations();
   }, []);
 
-  const fetchMessages = async () => {
+  const fetchConversations = async (before) => {
     try {
-      // FIX B: When this API is called, backend auto-marks messages as seen
-      const response = await messagesAPI.getMessages();
-      setMessages(response.data);
-      
-      // Refresh unread count in header (should now be 0)
-      refreshUnread?.();
+      const response = await messagesAPI.getConversations(before);
+      setConversations(prev => before ? [...prev, ...response.data.conversations] : response.data.conversations);
+      setNextBefore(response.data.next_before);
     } catch (error) {
-      console.error('Failed to fetch messages:', error);
+      console.error('Failed to fetch conversations:', error);
       toast.error('Failed to load notifications');
     } finally {
       setLoading(false);
     }
   };
 
-  const handleReact = async (messageId, reaction) => {
+  const fetchThread = async (conversationId, before) => {
+    try {
+      // FIX B: Opening the first page marks the conversation as seen on the backend
+      const response = await messagesAPI.getConversationMessages(conversationId, before);
+      setThreads(prev => ({
+        ...prev,
+        [conversationId]: {
+          messages: before ? [...(prev[conversationId]?.messages || []), ...response.data.messages] : response.data.messages,
+          nextBefore: response.data.next_before
+        }
+      }));
+      if (!before) {
+        setConversations(prev => prev.map(c => c.id === conversationId ? { ...c, unread_count: 0 } : c));
+        refreshUnread?.();
+      }
+    } catch (error) {
+      toast.error('Failed to load messages');
+    }
+  };
+
+  const toggleConversation = (conversationId) => {
+    if (openId === conversationId) {
+      setOpenId(null);
+      return;
+    }
+    setOpenId(conversationId);
+    fetchThread(conversationId);
+  };
+
+  const handleReact = async (conversationId, messageId, reaction) => {
     try {
       const token = localStorage.getItem('token');
       await axios.post(
@@ -50,21 +81,24 @@ const NotificationsPage = () => {
         { headers: { Authorization: `Bearer ${token}` } }
       );
       toast.success(reaction === 'thumbs_up' ? 'Reacted with 👍' : 'Reacted with 👎');
-      setMessages(messages.map(m => 
-        m.id === messageId ? { ...m, student_reaction: reaction } : m
-      ));
+      setThreads(prev => ({
+        ...prev,
+        [conversationId]: {
+          ...prev[conversationId],
+          messages: prev[conversationId].messages.map(m =>
+            m.id === messageId ? { ...m, student_reaction: reaction } : m
+          )
+        }
+      }));
     } catch (error) {
       toast.error('Failed to react');
     }
   };
 
-  // FIX B: All messages are now "seen" after viewing this page
-  // Show recently seen vs older messages instead
-  const recentMessages = messages.filter(m => {
-    const seenAt = m.seen_at ? new Date(m.seen_at) : null;
-    const now = new Date();
-    return seenAt && (now - seenAt) < 60000; // Seen within last minute = "just viewed"
-  });
+  const senderName = (conversation) =>
+    conversation.counterpart?.full_name || conversation.counterpart?.username || 'Admin';
+
+  const unreadTotal = conversations.reduce((sum, c) => sum + (c.unread_count || 0), 0);
 
   return (
     <div className="max-w-2xl mx-auto animate-fade-in" data-testid="notifications-page">
@@ -72,16 +106,13 @@ const NotificationsPage = () => {
         <div>
           <h1 className="font-outfit text-2xl font-bold text-slate-900">Notifications</h1>
           <p className="text-slate-500">
-            {messages.length > 0 ? `${messages.length} messages` : 'No messages yet'}
+            {conversations.length > 0
+              ? `${conversations.length} conversation${conversations.length !== 1 ? 's' : ''}`
+              : 'No messages yet'}
           </p>
         </div>
-        
-        {/* FIX B: Show "All Seen" indicator instead of manual button */}
-        {messages.length > 0 && (
-          <div className="flex items-center gap-2 text-sm text-green-600 bg-green-50 px-3 py-1.5 rounded-full">
-            <Eye className="w-4 h-4" />
-            <span>All messages viewed</span>
-          </div>
+        {unreadTotal > 0 && (
+          <Badge className="bg-blue-600">{unreadTotal} new</Badge>
         )}
       </div>
 
@@ -89,7 +120,7 @@ const NotificationsPage = () => {
         <div className="flex justify-center py-12">
           <div className="spinner" />
         </div>
-      ) : messages.length === 0 ? (
+      ) : conversations.length === 0 ? (
         <Card>
           <CardContent className="py-12 text-center">
             <Bell className="w-16 h-16 mx-auto text-slate-300 mb-4" />
@@ -99,68 +130,105 @@ const NotificationsPage = () => {
         </Card>
       ) : (
         <div className="space-y-3">
-          {messages.map((message) => (
-            <Card 
-              key={message.id}
-              className="transition-colors"
-              data-testid={`notification-${message.id}`}
-            >
-              <CardContent className="p-4">
-                <div className="flex gap-4">
-                  <div className="w-10 h-10 rounded-full flex items-center justify-center flex-shrink-0 bg-slate-100">
-                    <MailOpen className="w-5 h-5 text-slate-400" />
-                  </div>
-                  <div className="flex-1 min-w-0">
-                    <div className="flex items-start justify-between gap-2">
-                      <div className="flex-1">
-                        <p className="text-sm text-slate-900">{message.content}</p>
-                        <div className="flex items-center gap-2 mt-1">
-                          <p className="text-xs text-slate-500">
-                            {format(new Date(message.created_at), 'MMM d, yyyy • h:mm a')}
-                          </p>
-                          {/* FIX B: Show "Seen" timestamp */}
-                          {message.seen_at && (
-                            <span className="text-xs text-green-600">
-                              • Viewed {format(new Date(message.seen_at), 'h:mm a')}
-                            </span>
+          {conversations.map((conversation) => {
+            const isOpen = openId === conversation.id;
+            const thread = threads[conversation.id];
+            return (
+              <Card key={conversation.id} data-testid={`conversation-${conversation.id}`}>
+                <CardContent className="p-4">
+                  <button
+                    className="flex w-full gap-4 text-left"
+                    onClick={() => toggleConversation(conversation.id)}
+                  >
+                    <div className="w-10 h-10 rounded-full flex items-center justify-center flex-shrink-0 bg-slate-100">
+                      <MailOpen className="w-5 h-5 text-slate-400" />
+                    </div>
+                    <div className="flex-1 min-w-0">
+                      <div className="flex items-center justify-between gap-2">
+                        <p className="text-sm font-semibold text-slate-900">{senderName(conversation)}</p>
+                        <div className="flex items-center gap-2">
+                          {conversation.unread_count > 0 && (
+                            <Badge className="bg-blue-600 text-xs">{conversation.unread_count} new</Badge>
                           )}
+                          <ChevronRight className={`w-4 h-4 text-slate-400 transition-transform ${isOpen ? 'rotate-90' : ''}`} />
                         </div>
                       </div>
-                      {/* FIX B: Show "Viewed" badge instead of "New" */}
-                      <Badge variant="outline" className="text-xs text-slate-500">
-                        Viewed
-                      </Badge>
+                      {!isOpen && (
+                        <p className="text-sm text-slate-600 truncate">{conversation.last_message?.content}</p>
+                      )}
+                      <p className="text-xs text-slate-500 mt-1">
+                        {format(new Date(conversation.last_message_at), 'MMM d, yyyy • h:mm a')}
+                      </p>
                     </div>
+                  </button>
 
-                    {/* Student Reactions - Thumbs Up/Down */}
-                    <div className="flex items-center gap-2 mt-3">
-                      <span className="text-xs text-slate-500">React:</span>
-                      <div className="flex items-center gap-1">
-                        <Button
-                          variant={message.student_reaction === 'thumbs_up' ? 'default' : 'outline'}
-                          size="sm"
-                          className={`text-xs h-7 ${message.student_reaction === 'thumbs_up' ? 'bg-green-600 hover:bg-green-700' : ''}`}
-                          onClick={() => handleReact(message.id, 'thumbs_up')}
-                        >
-                          <ThumbsUp className="w-3.5 h-3.5" />
-                          {message.student_reaction === 'thumbs_up' && <span className="ml-1">Done</span>}
-                        </Button>
-                        <Button
-                          variant={message.student_reaction === 'thumbs_down' ? 'default' : 'outline'}
-                          size="sm"
-                          className={`text-xs h-7 ${message.student_reaction === 'thumbs_down' ? 'bg-red-600 hover:bg-red-700' : ''}`}
-                          onClick={() => handleReact(message.id, 'thumbs_down')}
-                        >
-                          <ThumbsDown className="w-3.5 h-3.5" />
-                          {message.student_reaction === 'thumbs_down' && <span className="ml-1">Done</span>}
-                        </Button>
-                      </div>
+                  {isOpen && (
+                    <div className="mt-4 space-y-3 border-t pt-4">
+                      {!thread ? (
+                        <div className="flex justify-center py-4">
+                          <div className="spinner" />
+                        </div>
+                      ) : (
+                        <>
+                          {thread.messages.map((message) => (
+                            <div key={message.id} className="rounded-lg bg-slate-50 p-3" data-testid={`notification-${message.id}`}>
+                              <p className="text-sm text-slate-900">{message.content}</p>
+                              <div className="flex items-center gap-2 mt-1">
+                                <p className="text-xs text-slate-500">
+                                  {format(new Date(message.created_at), 'MMM d, yyyy • h:mm a')}
+                                </p>
+                                {/* FIX B: Show "Seen" timestamp */}
+                                {message.seen_at && (
+                                  <span className="text-xs text-green-600">
+                                    • Viewed {format(new Date(message.seen_at), 'h:mm a')}
+                                  </span>
+                                )}
+                              </div>
+
+                              {/* Student Reactions - Thumbs Up/Down */}
+                              <div className="flex items-center gap-2 mt-3">
+                                <span className="text-xs text-slate-500">React:</span>
+                                <div className="flex items-center gap-1">
+                                  <Button
+                                    variant={message.student_reaction === 'thumbs_up' ? 'default' : 'outline'}
+                                    size="sm"
+                                    className={`text-xs h-7 ${message.student_reaction === 'thumbs_up' ? 'bg-green-600 hover:bg-green-700' : ''}`}
+                                    onClick={() => handleReact(conversation.id, message.id, 'thumbs_up')}
+                                  >
+                                    <ThumbsUp className="w-3.5 h-3.5" />
+                                    {message.student_reaction === 'thumbs_up' && <span className="ml-1">Done</span>}
+                                  </Button>
+                                  <Button
+                                    variant={message.student_reaction === 'thumbs_down' ? 'default' : 'outline'}
+                                    size="sm"
+                                    className={`text-xs h-7 ${message.student_reaction === 'thumbs_down' ? 'bg-red-600 hover:bg-red-700' : ''}`}
+                                    onClick={() => handleReact(conversation.id, message.id, 'thumbs_down')}
+                                  >
+                                    <ThumbsDown className="w-3.5 h-3.5" />
+                                    {message.student_reaction === 'thumbs_down' && <span className="ml-1">Done</span>}
+                                  </Button>
+                                </div>
+                              </div>
+                            </div>
+                          ))}
+                          {thread.nextBefore && (
+                            <Button variant="outline" size="sm" className="w-full" onClick={() => fetchThread(conversation.id, thread.nextBefore)}>
+                              Load older messages
+                            </Button>
+                          )}
+                        </>
+                      )}
                     </div>
-                  </div>
-                </div>
-              </CardContent>
-            </Card>
-          ))}
+                  )}
+                </CardContent>
+              </Card>
+            );
+          })}
+          {nextBefore && (
+            <Button variant="outline" className="w-full" onClick={() => fetchConversations(nextBefore)}>
+              Load more conversations
+            </Button>
+          )}
         </div>
       )}
     </div>
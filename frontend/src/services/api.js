@@ -80,7 +80,10 @@ export const messagesAPI = {
   sendMessage: (recipientId, recipientType, content, itemId) => 
     api.post('/messages', { recipient_id: recipientId, recipient_type: recipientType, content, item_id: itemId }),
   markAsRead: (id) => api.post(`/messages/${id}/read`),
-  markAllRead: () => api.post('/messages/mark-all-read')
+  markAllRead: () => api.post('/messages/mark-all-read'),
+  getConversations: (before) => api.get('/conversations', { params: { before } }),
+  getConversationMessages: (conversationId, before) =>
+    api.get(`/conversations/${encodeURIComponent(conversationId)}/messages`, { params: { before } })
 };
 
 // Students APIs (Admin)
@@ -96,6 +99,13 @@ export const studentsAPI = {
     formData.append('file', file);
     return api.post('/students/upload-excel', formData);
   },
+  // Uploads are imported in the background - poll the job for progress
+  getRosterImport: (jobId) => api.get(`/roster-imports/${jobId}`),
+  // Sync-mode folder uploads stop at a preview until committed
+  commitRosterImport: (jobId) => api.post(`/roster-imports/${jobId}/commit`),
+  // Preview rows are paged - kind is add, update or missing
+  getRosterImportPreview: (jobId, kind, skip = 0) =>
+    api.get(`/roster-imports/${jobId}/preview`, { params: { kind, skip } }),
   addNote: (studentId, note) => 
     api.post(`/students/${studentId}/admin-note`, { student_id: studentId, note }),
   deleteStudent: (id) => api.delete(`/students/${id}`)
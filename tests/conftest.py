@@ -0,0 +1,37 @@
+"""
+Shared fixtures. server.py is imported with placeholder connection settings and each
+test that needs a database gets a fresh in-memory one (pip install mongomock-motor),
+so the suite runs without a MongoDB server.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "backend"))
+
+# server.py reads these at import time; the client is lazy and never connects here
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "lost_found_tests")
+
+import server  # noqa: E402
+
+
+@pytest.fixture
+def db(monkeypatch):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    database = mongomock_motor.AsyncMongoMockClient()["lost_found_tests"]
+    monkeypatch.setattr(server, "db", database)
+    return database
+
+
+@pytest.fixture
+def import_jobs(db, tmp_path, monkeypatch):
+    """Roster jobs processed inline: spool files under tmp_path, parsing in a thread"""
+    monkeypatch.setattr(server, "ROSTER_IMPORT_DIR", tmp_path)
+    monkeypatch.setattr(server, "get_roster_process_pool", lambda: None)
+    monkeypatch.setattr(server, "ROSTER_IMPORT_CHUNK_ROWS", 2)
+    return db
@@ -0,0 +1,16 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+CHECK_INDEXES = Path(__file__).resolve().parent.parent / "backend" / "check_indexes.py"
+
+
+def test_static_check_runs_without_database_settings():
+    env = {key: value for key, value in os.environ.items() if key not in ("MONGO_URL", "DB_NAME")}
+    result = subprocess.run(
+        [sys.executable, str(CHECK_INDEXES), "--static"],
+        env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "0 without a usable index" in result.stdout
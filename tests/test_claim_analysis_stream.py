@@ -0,0 +1,30 @@
+import asyncio
+
+import server
+
+ADMIN = {"sub": "admin-1", "role": "admin"}
+
+
+def test_closing_one_stream_does_not_strand_the_others(db):
+    async def scenario():
+        await db.claims.insert_one({"id": "claim-1", "claimant_id": "student-1", "ai_analysis": {"status": "pending"}})
+        first = (await server.stream_claim_analysis("claim-1", ADMIN)).body_iterator
+        second = (await server.stream_claim_analysis("claim-1", ADMIN)).body_iterator
+        first_read = asyncio.create_task(first.__anext__())
+        second_read = asyncio.create_task(second.__anext__())
+        await asyncio.sleep(0.01)
+        assert len(server.claim_analysis_events["claim-1"]) == 2
+
+        first_read.cancel()  # The first client disconnects
+        await asyncio.sleep(0.01)
+        assert len(server.claim_analysis_events["claim-1"]) == 1
+
+        await db.claims.update_one({"id": "claim-1"}, {"$set": {"ai_analysis": {"status": "completed"}}})
+        server.notify_claim_analysis("claim-1")
+        message = await asyncio.wait_for(second_read, timeout=1)  # Well before the 5 s re-read
+        assert message.startswith("event: analysis") and '"status": "completed"' in message
+
+        await second.aclose()
+        assert "claim-1" not in server.claim_analysis_events
+
+    asyncio.run(scenario())
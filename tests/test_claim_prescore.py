@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+import server
+
+FOUND_PHONE = {
+    "id": "found-1",
+    "item_keyword": "phone",
+    "category_id": server.resolve_item_category("phone"),
+    "secret_message": "cracked screen protector with a pikachu sticker",
+    "location": "Central library second floor",
+    "created_date": "2026-03-10",
+}
+
+
+def claim_data(description, marks, product_type="phone", lost_location="central library", approximate_date="2026-03-09"):
+    return {
+        "product_type": product_type,
+        "description": description,
+        "identification_marks": marks,
+        "lost_location": lost_location,
+        "approximate_date": approximate_date,
+        "description_quality": server.assess_input_quality(description),
+        "marks_quality": server.assess_input_quality(marks),
+    }
+
+
+STRONG_CLAIM = claim_data(
+    "Black Samsung Galaxy S21 in a blue rubber case",
+    "pikachu sticker on the back and a cracked screen protector",
+)
+
+
+def test_strong_claim_is_accepted_by_the_pre_scorer():
+    prescore = server.prescore_claim(FOUND_PHONE, STRONG_CLAIM)
+    assert prescore["decision"] == "accept"
+    assert prescore["score"] >= server.PRESCORE_HIGH_CUTOFF
+    assert prescore["signals"]["category"] == 100
+    assert prescore["secret_findings"] == ["Identification marks match the finder's secret identifier"]
+
+
+def test_secret_findings_stay_out_of_the_claimant_visible_lists():
+    prescore = server.prescore_claim(FOUND_PHONE, STRONG_CLAIM)
+    visible = prescore["what_matched"] + prescore["what_did_not_match"] + prescore["missing_information"]
+    assert not any("secret" in line.lower() for line in visible)
+
+
+def test_generic_claim_is_rejected_as_insufficient():
+    prescore = server.prescore_claim(FOUND_PHONE, claim_data("phone", "black"))
+    assert prescore["decision"] == "reject"
+    assert prescore["score"] <= server.CONFIDENCE_BANDS["INSUFFICIENT"][1]
+    assert server.rule_based_claim_analysis(prescore, claim_data("phone", "black"))["confidence_band"] == "INSUFFICIENT"
+
+
+@pytest.mark.parametrize("overrides, conflict", [
+    ({"product_type": "wallet"}, "what_did_not_match"),
+    ({"approximate_date": "2026-03-20"}, "inconsistencies"),
+])
+def test_conflicting_claim_is_rejected_into_the_low_band(overrides, conflict):
+    data = {**STRONG_CLAIM, **overrides}
+    prescore = server.prescore_claim(FOUND_PHONE, data)
+    assert prescore["decision"] == "reject"
+    assert prescore[conflict]
+    low, high = server.CONFIDENCE_BANDS["LOW"]
+    assert low <= prescore["score"] <= high
+
+
+def test_claim_without_the_secret_detail_is_left_to_the_llm():
+    data = claim_data("Black Samsung Galaxy S21 in a blue rubber case", "small scratch near the camera lens")
+    assert server.prescore_claim(FOUND_PHONE, data)["decision"] == "ambiguous"
+
+
+def test_rule_based_analysis_never_rates_above_medium():
+    prescore = server.prescore_claim(FOUND_PHONE, STRONG_CLAIM)
+    analysis = server.rule_based_claim_analysis(prescore, STRONG_CLAIM)
+    assert analysis["confidence_band"] == "MEDIUM"
+    assert analysis["source"] == "rules"
+
+
+def test_accepted_claim_without_llm_is_capped_at_medium(monkeypatch):
+    monkeypatch.setattr(server, "llm_available", lambda: False)
+    ai_analysis, _questions, internal_score, prescore = asyncio.run(
+        server.analyze_claim(FOUND_PHONE, STRONG_CLAIM, "student-1")
+    )
+    assert ai_analysis["confidence_band"] == "MEDIUM"
+    assert internal_score <= server.CONFIDENCE_BANDS["MEDIUM"][1]
+    assert "prescore" not in ai_analysis
+    assert prescore["decision"] == "accept"
+
+
+def test_student_payload_hides_scores_and_the_finders_secret():
+    claim = {
+        "id": "claim-1",
+        "claimant_id": "student-1",
+        "ai_analysis": {"status": "completed", "confidence_band": "MEDIUM", "prescore": {"score": 84}},
+        "ai_internal_score": 70,
+        "ai_prescore": {"score": 84, "secret_findings": ["Identification marks match the finder's secret identifier"]},
+        "item": {**FOUND_PHONE, "precomputed_questions": {"claim_questions": []}},
+    }
+    admin = server.claim_analysis_payload("claim-1", dict(claim), {"role": "admin", "sub": "admin-1"})
+    assert admin["ai_prescore"]["score"] == 84
+    assert admin["ai_internal_score"] == 70
+
+    student = server.strip_claim_for_student(dict(claim, item=dict(claim["item"])))
+    assert "ai_prescore" not in student
+    assert "ai_internal_score" not in student
+    assert "prescore" not in student["ai_analysis"]
+    assert "secret_message" not in student["item"]
+    assert "precomputed_questions" not in student["item"]
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+import server
+
+FOUND_ITEM = {
+    "id": "found-1",
+    "item_type": "found",
+    "is_deleted": False,
+    "item_keyword": "phone",
+    "description": "Black phone in a blue case",
+    "location": "Central library",
+    "secret_message": "pikachu sticker",
+}
+STUDENT = {"sub": "student-1", "role": "student"}
+
+
+@pytest.fixture
+def failing_llm(db, monkeypatch):
+    calls = []
+
+    async def failing_request(*args):
+        calls.append(args)
+        await asyncio.sleep(0.01)
+        raise TimeoutError("provider timed out")
+
+    monkeypatch.setattr(server, "llm_available", lambda: True)
+    monkeypatch.setattr(server, "request_claim_questions", failing_request)
+    monkeypatch.setattr(server, "request_secret_questions", failing_request)
+    return calls
+
+
+def ask(item_id="found-1"):
+    return server.generate_claim_questions(
+        server.GenerateQuestionsRequest(item_keyword="phone", description="", item_id=item_id), STUDENT
+    )
+
+
+def test_missing_precomputed_questions_are_served_from_templates_without_waiting(db, failing_llm):
+    async def scenario():
+        await db.items.insert_one(dict(FOUND_ITEM))
+        first, second = await asyncio.gather(ask(), ask())
+        assert first["source"] == second["source"] == "fallback"
+        assert first["questions"] == server.template_claim_questions(
+            "phone", FOUND_ITEM["description"], FOUND_ITEM["location"], FOUND_ITEM["secret_message"]
+        )
+        # Answered while the precompute is still waiting on the provider - one for both requests
+        precomputes = list(server._background_tasks)
+        assert len(precomputes) == 1 and not precomputes[0].done()
+        await asyncio.gather(*precomputes)
+        assert len(failing_llm) == 2  # The claim and the secret questions, each tried once
+
+    asyncio.run(scenario())
+
+
+def test_precomputed_questions_are_served_without_an_llm_call(db, failing_llm):
+    async def scenario():
+        item = dict(FOUND_ITEM)
+        item["precomputed_questions"] = {
+            "fingerprint": server.question_source_fingerprint(item),
+            "claim_questions": ["Q1", "Q2", "Q3"],
+            "secret_questions": None,
+        }
+        await db.items.insert_one(item)
+        response = await ask()
+        assert response == {"questions": ["Q1", "Q2", "Q3"], "source": "ai", "precomputed": True}
+        assert failing_llm == []
+
+    asyncio.run(scenario())
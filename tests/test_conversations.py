@@ -0,0 +1,113 @@
+import asyncio
+
+import server
+
+STUDENT = {"sub": "student-1", "role": "student"}
+
+
+def message(message_id, created_at, sender="admin-1", recipient="student-1", is_read=False, **extra):
+    sender_type = "student" if sender.startswith("student") else "admin"
+    recipient_type = "student" if recipient.startswith("student") else "admin"
+    return {
+        "id": message_id, "sender_id": sender, "sender_type": sender_type,
+        "recipient_id": recipient, "recipient_type": recipient_type,
+        "content": f"message {message_id}", "is_read": is_read, "created_at": created_at, **extra
+    }
+
+
+def test_conversation_id_is_the_same_from_either_side():
+    assert server.conversation_id_for("b", "a") == server.conversation_id_for("a", "b") == "a:b"
+
+
+def test_insert_message_keeps_the_summary_and_unread_counts(db):
+    async def scenario():
+        await server.insert_message(message("m1", "2026-03-01T10:00:00"))
+        await server.insert_message(message("m2", "2026-03-01T11:00:00", sender="student-1", recipient="admin-1"))
+        conversation = await db.conversations.find_one({"id": "admin-1:student-1"}, {"_id": 0})
+        assert conversation["message_count"] == 2
+        assert conversation["last_message"]["id"] == "m2"
+        assert conversation["unread_counts"] == {"student-1": 1, "admin-1": 1}
+
+    asyncio.run(scenario())
+
+
+def test_rebuild_matches_the_incremental_summary(db):
+    async def scenario():
+        await server.insert_message(message("m1", "2026-03-01T10:00:00"))
+        await server.insert_message(message("m2", "2026-03-01T11:00:00", is_read=True))
+        await server.insert_message(message("m3", "2026-03-01T12:00:00", sender="student-1", recipient="admin-1"))
+        incremental = await db.conversations.find_one({"id": "admin-1:student-1"}, {"_id": 0})
+
+        await db.conversations.delete_many({})
+        await server.rebuild_conversation("admin-1:student-1")
+        rebuilt = await db.conversations.find_one({"id": "admin-1:student-1"}, {"_id": 0})
+        assert rebuilt == incremental
+
+    asyncio.run(scenario())
+
+
+def test_rebuild_after_deleting_every_message_drops_the_conversation(db):
+    async def scenario():
+        await server.insert_message(message("m1", "2026-03-01T10:00:00"))
+        await db.messages.delete_many({})
+        await server.rebuild_conversation("admin-1:student-1")
+        assert await db.conversations.count_documents({}) == 0
+
+    asyncio.run(scenario())
+
+
+def test_backfill_groups_old_messages_and_keeps_the_first_message_time(db):
+    async def scenario():
+        await db.messages.insert_many([
+            message("m2", "2026-03-02T09:00:00"),
+            message("m1", "2026-03-01T09:00:00", is_read=True),
+            message("m3", "2026-03-03T09:00:00", sender="system", recipient="student-1"),
+        ])
+        await server.backfill_conversations()
+
+        conversation = await db.conversations.find_one({"id": "admin-1:student-1"}, {"_id": 0})
+        assert conversation["created_at"] == "2026-03-01T09:00:00"
+        assert conversation["last_message_at"] == "2026-03-02T09:00:00"
+        assert conversation["unread_counts"] == {"student-1": 1}
+        assert await db.conversations.count_documents({"participant_ids": "student-1"}) == 2
+        assert await db.messages.count_documents({"conversation_id": {"$exists": False}}) == 0
+
+        # Runs once - a second call finds the marker and leaves the summaries alone
+        await db.conversations.delete_many({})
+        await server.backfill_conversations()
+        assert await db.conversations.count_documents({}) == 0
+
+    asyncio.run(scenario())
+
+
+def test_thread_pages_do_not_skip_or_repeat_messages_with_equal_timestamps(db):
+    async def scenario():
+        for number in range(7):
+            # Three messages share each timestamp
+            await server.insert_message(message(f"m{number}", f"2026-03-01T10:00:0{number // 3}"))
+
+        seen, before = [], None
+        while True:
+            page = await server.get_conversation_messages("admin-1:student-1", before, 2, STUDENT)
+            seen.extend(entry["id"] for entry in page["messages"])
+            before = page["next_before"]
+            if not before:
+                break
+        assert sorted(seen) == [f"m{number}" for number in range(7)]
+        assert len(seen) == len(set(seen))
+
+    asyncio.run(scenario())
+
+
+def test_opening_a_thread_marks_it_read(db):
+    async def scenario():
+        await server.insert_message(message("m1", "2026-03-01T10:00:00"))
+        await server.insert_message(message("m2", "2026-03-01T11:00:00"))
+        inbox = await server.get_conversations(None, 20, STUDENT)
+        assert inbox["conversations"][0]["unread_count"] == 2
+
+        await server.get_conversation_messages("admin-1:student-1", None, 50, STUDENT)
+        inbox = await server.get_conversations(None, 20, STUDENT)
+        assert inbox["conversations"][0]["unread_count"] == 0
+
+    asyncio.run(scenario())
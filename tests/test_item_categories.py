@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+@pytest.mark.parametrize("keyword, category_id", [
+    ("phone", "phone"),
+    ("Mobile Phone", "phone"),
+    ("iphone 13 pro", "phone"),
+    ("I-Phone 13!", "phone"),
+    ("Samsung Galaxy", "phone"),
+    ("laptop charger", "charger"),  # Head noun wins over the modifier
+    ("laptop bag", "bag"),
+    ("Wallets", "wallet"),
+    ("water bottles", "bottle"),
+    ("black leather purse", "wallet"),
+    ("ID CARD", "id_card"),
+    ("Id Card", "id_card"),
+    ("Earbuds", "earphones"),
+])
+def test_keyword_aliases_resolve_to_their_category(keyword, category_id):
+    assert server.resolve_item_category(keyword) == category_id
+
+
+@pytest.mark.parametrize("keyword", ["", "   ", None, "xyzzy gadget", "!!!"])
+def test_unknown_or_empty_keywords_resolve_to_other(keyword):
+    assert server.resolve_item_category(keyword) == server.OTHER_CATEGORY_ID
+
+
+def test_every_synonym_resolves_to_its_own_category():
+    for category_id, category in server.ITEM_CATEGORIES.items():
+        for synonym in category["synonyms"]:
+            assert server.resolve_item_category(synonym) == category_id, synonym
+
+
+def test_stored_category_wins_over_the_keyword():
+    assert server.get_item_category({"category_id": "bag", "item_keyword": "phone"}) == "bag"
+    assert server.get_item_category({"item_keyword": "phone"}) == "phone"
+
+
+def test_backfill_resolves_items_without_a_category(db):
+    async def scenario():
+        await db.items.insert_many([
+            {"id": "i1", "item_keyword": "iPhone"},
+            {"id": "i2", "item_keyword": "iPhone"},
+            {"id": "i3", "item_keyword": "backpack"},
+            {"id": "i4", "item_keyword": "mystery thing"},
+        ])
+        await server.backfill_item_categories()
+        items = await db.items.find({}, {"_id": 0, "id": 1, "category_id": 1}).to_list(10)
+        assert {item["id"]: item["category_id"] for item in items} == {
+            "i1": "phone", "i2": "phone", "i3": "bag", "i4": "other"
+        }
+        marker = await db.system_config.find_one({"key": "item_categories_backfilled"})
+        assert marker["version"] == server.CATEGORY_TAXONOMY_VERSION
+
+    asyncio.run(scenario())
+
+
+def test_backfill_at_the_current_version_only_fills_missing_categories(db):
+    async def scenario():
+        await db.system_config.insert_one(
+            {"key": "item_categories_backfilled", "version": server.CATEGORY_TAXONOMY_VERSION}
+        )
+        await db.items.insert_many([
+            {"id": "i1", "item_keyword": "iPhone", "category_id": "bag"},  # Left alone
+            {"id": "i2", "item_keyword": "iPhone"},
+        ])
+        await server.backfill_item_categories()
+        items = await db.items.find({}, {"_id": 0, "id": 1, "category_id": 1}).to_list(10)
+        assert {item["id"]: item["category_id"] for item in items} == {"i1": "bag", "i2": "phone"}
+
+    asyncio.run(scenario())
+
+
+def test_backfill_re_resolves_everything_after_a_taxonomy_change(db):
+    async def scenario():
+        await db.system_config.insert_one(
+            {"key": "item_categories_backfilled", "version": server.CATEGORY_TAXONOMY_VERSION - 1}
+        )
+        await db.items.insert_one({"id": "i1", "item_keyword": "iPhone", "category_id": "other"})
+        await server.backfill_item_categories()
+        assert (await db.items.find_one({"id": "i1"}))["category_id"] == "phone"
+
+    asyncio.run(scenario())
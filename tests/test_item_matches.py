@@ -0,0 +1,62 @@
+import asyncio
+
+import server
+
+STUDENT = {"sub": "student-1", "role": "student"}
+
+
+def item(item_id, item_type, status="reported", student_id="student-2"):
+    return {
+        "id": item_id, "item_type": item_type, "status": status, "is_deleted": False,
+        "student_id": student_id, "item_keyword": "phone", "description": "", "status_history": [],
+    }
+
+
+def match(lost_item_id, found_item_id, confidence=80):
+    return {"lost_item_id": lost_item_id, "found_item_id": found_item_id, "confidence": confidence, "reason": "same phone"}
+
+
+async def seed(db):
+    await db.items.insert_many([
+        item("lost-1", "lost", student_id="student-1"),
+        item("found-1", "found"),
+        item("found-2", "found"),
+    ])
+    await db.item_matches.insert_many([match("lost-1", "found-1"), match("lost-1", "found-2")])
+
+
+def test_closing_an_item_drops_its_matches(db):
+    async def scenario():
+        await seed(db)
+        await server.set_item_status("found-1", "claimed", "admin-1", "Handed over")
+        remaining = await db.item_matches.find({}, {"_id": 0, "found_item_id": 1}).to_list(10)
+        assert [row["found_item_id"] for row in remaining] == ["found-2"]
+
+        # Still open - the lost item keeps its matches while someone reports finding it
+        await server.set_item_status("lost-1", "found_reported", "student-2", "Someone found it")
+        assert await db.item_matches.count_documents({}) == 1
+
+    asyncio.run(scenario())
+
+
+def test_deleting_an_item_drops_its_matches(db):
+    async def scenario():
+        await seed(db)
+        await server.soft_delete_item("lost-1", server.DeleteReason(reason="Found it myself"), STUDENT)
+        assert await db.item_matches.count_documents({}) == 0
+
+    asyncio.run(scenario())
+
+
+def test_found_similar_skips_matches_to_closed_items(db):
+    async def scenario():
+        await seed(db)
+        # Closed without set_item_status (e.g. before this cleanup existed) - the match row is stale
+        await db.items.update_one({"id": "found-1"}, {"$set": {"status": "returned"}})
+        response = await server.get_found_similar_items(STUDENT)
+        assert [found["id"] for found in response["found_similar"]] == ["found-2"]
+
+        matches = await server.get_item_matches("lost-1", STUDENT)
+        assert [row["found_item_id"] for row in matches["matches"]] == ["found-2"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,165 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import server
+
+
+def make_request(peer="10.0.0.9", forwarded_for=None):
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": headers, "client": (peer, 5000)})
+
+
+@pytest.fixture
+def attempts(monkeypatch):
+    counter = server.SlidingWindowCounter(60)
+    monkeypatch.setattr(server, "login_attempts", counter)
+    monkeypatch.setattr(server, "LOGIN_MAX_FAILURES_PER_ACCOUNT", 3)
+    monkeypatch.setattr(server, "LOGIN_MAX_FAILURES_PER_IP", 5)
+    monkeypatch.setattr(server, "LOGIN_TRUSTED_PROXY_HOPS", 0)
+    return counter
+
+
+def test_client_ip_ignores_forwarded_for_without_trusted_proxies():
+    request = make_request(forwarded_for="1.2.3.4")
+    assert server.client_ip(request, trusted_hops=0) == "10.0.0.9"
+
+
+def test_client_ip_takes_the_entry_appended_by_the_outermost_trusted_proxy():
+    # Client spoofed "6.6.6.6"; the ingress appended the real address, the load balancer its own
+    request = make_request(forwarded_for="6.6.6.6, 203.0.113.7, 10.1.1.1")
+    assert server.client_ip(request, trusted_hops=2) == "203.0.113.7"
+    assert server.client_ip(request, trusted_hops=1) == "10.1.1.1"
+
+
+def test_client_ip_falls_back_to_peer_when_header_is_shorter_than_the_proxy_chain():
+    assert server.client_ip(make_request(forwarded_for="6.6.6.6"), trusted_hops=2) == "10.0.0.9"
+    assert server.client_ip(make_request(), trusted_hops=1) == "10.0.0.9"
+
+
+def test_account_is_throttled_after_max_failures(attempts):
+    async def scenario():
+        request = make_request()
+        for _ in range(server.LOGIN_MAX_FAILURES_PER_ACCOUNT):
+            await server.check_login_throttle("student", "21CSE001", request)  # Each one failed
+        with pytest.raises(HTTPException) as raised:
+            await server.check_login_throttle("student", " 21cse001 ", request)
+        assert raised.value.status_code == 429
+        assert int(raised.value.headers["Retry-After"]) > 0
+        # Another account from the same address is still allowed
+        await server.check_login_throttle("student", "21CSE002", request)
+
+    asyncio.run(scenario())
+
+
+def test_successful_logins_do_not_count_towards_the_limit(attempts):
+    async def scenario():
+        request = make_request()
+        for _ in range(server.LOGIN_MAX_FAILURES_PER_IP * 2):
+            await server.clear_login_failures(await server.check_login_throttle("student", "21CSE001", request))
+
+    asyncio.run(scenario())
+
+
+def test_success_clears_only_the_account_failures(attempts):
+    async def scenario():
+        request = make_request()
+        for _ in range(server.LOGIN_MAX_FAILURES_PER_ACCOUNT - 1):
+            await server.check_login_throttle("admin", "root", request)
+        reservation = await server.check_login_throttle("admin", "root", request)
+        await server.clear_login_failures(reservation)
+        account_key, ip_key, _ = reservation
+        assert await attempts.retry_after(account_key, 1) == 0
+        # The earlier failures still count against the address, the successful attempt doesn't
+        assert await attempts.retry_after(ip_key, server.LOGIN_MAX_FAILURES_PER_ACCOUNT - 1) > 0
+        assert await attempts.retry_after(ip_key, server.LOGIN_MAX_FAILURES_PER_ACCOUNT) == 0
+
+    asyncio.run(scenario())
+
+
+def test_ip_is_throttled_across_accounts(attempts):
+    async def scenario():
+        request = make_request()
+        for number in range(server.LOGIN_MAX_FAILURES_PER_IP):
+            await server.check_login_throttle("student", f"R{number}", request)
+        with pytest.raises(HTTPException) as raised:
+            await server.check_login_throttle("student", "fresh-account", request)
+        assert raised.value.status_code == 429
+        await server.check_login_throttle("student", "fresh-account", make_request(peer="10.0.0.10"))
+
+    asyncio.run(scenario())
+
+
+def test_rejected_ip_attempt_gives_back_its_account_slot(attempts, monkeypatch):
+    monkeypatch.setattr(server, "LOGIN_MAX_FAILURES_PER_IP", 1)
+
+    async def scenario():
+        request = make_request()
+        await server.check_login_throttle("student", "R1", request)
+        with pytest.raises(HTTPException):
+            await server.check_login_throttle("student", "R2", request)
+        assert await attempts.retry_after("student:r2|10.0.0.9", 1) == 0
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_wrong_password_burst_is_throttled_before_bcrypt(attempts, db, monkeypatch):
+    verified = []
+
+    async def slow_verify(password, hashed):
+        verified.append(password)
+        await asyncio.sleep(0.01)  # Every attempt is in flight at once
+        return False
+
+    monkeypatch.setattr(server, "verify_password", slow_verify)
+
+    async def scenario():
+        await db.admins.insert_one({"id": "admin-1", "username": "root", "password": "hash", "role": "admin"})
+        results = await asyncio.gather(*(
+            server.admin_login(server.AdminLogin(username="root", password=f"guess-{number}"), make_request())
+            for number in range(50)
+        ), return_exceptions=True)
+        statuses = sorted(result.status_code for result in results)
+        assert statuses.count(401) == server.LOGIN_MAX_FAILURES_PER_ACCOUNT
+        assert statuses.count(429) == 50 - server.LOGIN_MAX_FAILURES_PER_ACCOUNT
+        assert len(verified) == server.LOGIN_MAX_FAILURES_PER_ACCOUNT
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_burst_is_throttled_with_the_mongo_counter(db, monkeypatch):
+    monkeypatch.setattr(server, "login_attempts", server.MongoSlidingWindowCounter(60))
+    monkeypatch.setattr(server, "LOGIN_MAX_FAILURES_PER_ACCOUNT", 3)
+    monkeypatch.setattr(server, "LOGIN_TRUSTED_PROXY_HOPS", 0)
+
+    async def scenario():
+        await db.students.insert_one({"id": "s1", "roll_number": "21CSE001", "dob": "01-02-2003"})
+        results = await asyncio.gather(*(
+            server.student_login(server.StudentLogin(roll_number="21CSE001", dob="02-02-2003"), make_request())
+            for _ in range(20)
+        ), return_exceptions=True)
+        statuses = [result.status_code for result in results]
+        assert statuses.count(401) == 3
+        assert statuses.count(429) == 17
+
+    asyncio.run(scenario())
+
+
+def test_mongo_counter_matches_in_memory_counter(db):
+    async def scenario():
+        counter = server.MongoSlidingWindowCounter(60)
+        tokens = []
+        for _ in range(3):
+            token, wait = await counter.reserve("ip:10.0.0.9", 3)
+            assert token and wait == 0
+            tokens.append(token)
+        token, wait = await counter.reserve("ip:10.0.0.9", 3)
+        assert token is None and 0 < wait <= 60
+        await counter.release("ip:10.0.0.9", tokens[0])
+        assert await counter.retry_after("ip:10.0.0.9", 3) == 0
+        await counter.reset("ip:10.0.0.9")
+        assert await counter.retry_after("ip:10.0.0.9", 1) == 0
+
+    asyncio.run(scenario())
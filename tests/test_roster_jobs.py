@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+from starlette.datastructures import UploadFile
+
+import server
+
+STUDENT_COLUMNS = ["Roll Number", "Full Name", "Department", "Year", "DOB", "Email", "Phone Number"]
+
+
+def lease(seconds):
+    return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).isoformat()
+
+
+async def queue_upload(tmp_path, rows):
+    path = tmp_path / "upload.csv"
+    pd.DataFrame(rows, columns=STUDENT_COLUMNS).to_csv(path, index=False)
+    with open(path, "rb") as f:
+        job = await server.create_roster_import_job(UploadFile(f, filename="upload.csv"), {"sub": "admin-1"})
+    server.roster_import_queue.get_nowait()
+    return job["id"]
+
+
+def test_a_job_is_imported_once_when_two_workers_pick_it_up(import_jobs, tmp_path):
+    async def scenario():
+        job_id = await queue_upload(tmp_path, [
+            (f"R{number}", "Asha", "CSE", "2", "01-02-2003", f"r{number}@college.edu", "9876543210")
+            for number in range(5)
+        ])
+        await asyncio.gather(server.process_roster_import(job_id), server.process_roster_import(job_id))
+        job = await import_jobs.excel_uploads.find_one({"id": job_id}, {"_id": 0})
+        assert job["status"] == "completed"
+        assert (job["rows_done"], job["students_added"], job["students_skipped"]) == (5, 5, 0)
+        assert job["lease_until"] is None
+        assert await import_jobs.students.count_documents({}) == 5
+
+    asyncio.run(scenario())
+
+
+def test_recovery_only_touches_jobs_whose_lease_lapsed(db):
+    async def scenario():
+        await db.excel_uploads.insert_many([
+            {"id": "live-import", "status": "processing", "lease_until": lease(60), "errors": [], "error_count": 0},
+            {"id": "dead-import", "status": "processing", "lease_until": lease(-60), "errors": [], "error_count": 0},
+            {"id": "old-import", "status": "processing", "errors": [], "error_count": 0},  # From before leases
+            {"id": "live-commit", "status": "committing", "lease_until": lease(60), "errors": [], "error_count": 0},
+            {"id": "dead-commit", "status": "committing", "lease_until": lease(-60), "errors": [], "error_count": 0},
+            {"id": "waiting", "status": "queued", "errors": [], "error_count": 0},
+        ])
+        await server.resume_roster_imports()
+
+        jobs = await db.excel_uploads.find({}, {"_id": 0}).to_list(10)
+        status = {job["id"]: job["status"] for job in jobs}
+        assert status == {
+            "live-import": "processing", "dead-import": "failed", "old-import": "failed",
+            "live-commit": "committing", "dead-commit": "preview_ready", "waiting": "queued"
+        }
+        reopened = next(job for job in jobs if job["id"] == "dead-commit")
+        assert reopened["error_count"] == 1 and "Commit again" in reopened["errors"][0]
+        assert server.roster_import_queue.get_nowait() == "waiting"
+        assert server.roster_import_queue.empty()
+
+    asyncio.run(scenario())
+
+
+def test_a_running_job_keeps_renewing_its_lease(db, monkeypatch):
+    monkeypatch.setattr(server, "ROSTER_JOB_LEASE_SECONDS", 0.03)
+
+    async def scenario():
+        await db.excel_uploads.insert_one({"id": "job-1", "status": "processing", "lease_until": lease(-60)})
+        renewal = asyncio.create_task(server.renew_roster_lease("job-1", "processing"))
+        await asyncio.sleep(0.05)
+        renewal.cancel()
+        job = await db.excel_uploads.find_one({"id": "job-1"})
+        assert job["lease_until"] > datetime.now(timezone.utc).isoformat()
+
+    asyncio.run(scenario())
@@ -0,0 +1,94 @@
+import asyncio
+
+import pandas as pd
+import pytest
+from starlette.datastructures import UploadFile
+
+import server
+
+FOLDER_COLUMNS = ["Roll Number", "Full Name", "DOB", "Email", "Phone Number"]
+
+
+def folder_student(student_id, roll_number, full_name, email, year_folder_id="year-1"):
+    return {
+        "id": student_id, "roll_number": roll_number, "full_name": full_name, "dob": "01-02-2003",
+        "email": email, "phone_number": "9876543210", "year_folder_id": year_folder_id
+    }
+
+
+async def upload_sync(tmp_path, rows):
+    path = tmp_path / "upload.csv"
+    pd.DataFrame(rows, columns=FOLDER_COLUMNS).to_csv(path, index=False)
+    folder_fields = {
+        "department": "CSE", "year": "2", "department_folder_id": "dept-1", "year_folder_id": "year-1"
+    }
+    with open(path, "rb") as f:
+        job = await server.create_roster_import_job(
+            UploadFile(f, filename="upload.csv"), {"sub": "super-1"}, mode="sync", **folder_fields
+        )
+    server.roster_import_queue.get_nowait()
+    await server.process_roster_import(job["id"])
+    return await server.db.excel_uploads.find_one({"id": job["id"]}, {"_id": 0})
+
+
+def test_sync_preview_diffs_the_file_against_the_folder(import_jobs, tmp_path):
+    async def scenario():
+        await import_jobs.students.insert_many([
+            folder_student("s1", "R1", "Asha", "asha@college.edu"),
+            folder_student("s2", "R2", "Ravi", "ravi@college.edu"),
+            folder_student("s3", "R3", "Meena", "meena@college.edu"),
+            folder_student("s9", "X9", "Elsewhere", "x9@college.edu", year_folder_id="year-2"),
+        ])
+        job = await upload_sync(tmp_path, [
+            ("R1", "Asha", "01-02-2003", "asha@college.edu", "9876543210"),
+            ("R2", "Ravi Kumar", "01-02-2003", "ravi@college.edu", "9876543210"),
+            ("R4", "Nila", "01-02-2003", "nila@college.edu", "9876543210"),
+            ("R2", "Ravi dup", "01-02-2003", "ravi@college.edu", "9876543210"),
+            ("X9", "Elsewhere", "01-02-2003", "x9@college.edu", "9876543210"),
+        ])
+        assert job["status"] == "preview_ready"
+        assert job["sync_summary"] == {"add": 1, "update": 1, "missing": 1, "unchanged": 1}
+        assert {skip["reason"] for skip in job["skipped_rows"]} == {"duplicate in file", "in another folder"}
+        assert "sync_preview" not in job  # Rows live in roster_sync_previews
+
+        update = await server.get_roster_sync_preview(job["id"], "update", 0, 100, {"sub": "super-1"})
+        assert update["rows"][0]["changes"] == {"full_name": {"from": "Ravi", "to": "Ravi Kumar"}}
+        missing = await server.get_roster_sync_preview(job["id"], "missing", 0, 100, {"sub": "super-1"})
+        assert [row["roll_number"] for row in missing["rows"]] == ["R3"]
+        assert await import_jobs.students.count_documents({}) == 4  # Nothing written before commit
+
+        committed = await server.commit_roster_sync(job["id"], {"sub": "super-1"})
+        assert (committed["students_added"], committed["students_updated"]) == (1, 1)
+        students = await import_jobs.students.find({"year_folder_id": "year-1"}, {"_id": 0}).to_list(10)
+        by_roll = {student["roll_number"]: student for student in students}
+        assert by_roll["R2"]["full_name"] == "Ravi Kumar"
+        assert by_roll["R4"]["department_folder_id"] == "dept-1"
+        assert "R3" in by_roll  # Missing students are reported, never deleted
+        assert await import_jobs.roster_sync_previews.count_documents({"job_id": job["id"]}) == 0
+
+    asyncio.run(scenario())
+
+
+def test_sync_commit_runs_once(import_jobs, tmp_path):
+    async def scenario():
+        job = await upload_sync(tmp_path, [("R1", "Asha", "01-02-2003", "asha@college.edu", "9876543210")])
+        await server.commit_roster_sync(job["id"], {"sub": "super-1"})
+        with pytest.raises(server.HTTPException) as raised:
+            await server.commit_roster_sync(job["id"], {"sub": "super-1"})
+        assert raised.value.status_code == 400
+        assert await import_jobs.students.count_documents({}) == 1
+
+    asyncio.run(scenario())
+
+
+def test_job_keeps_a_capped_error_list_and_the_full_count(import_jobs, tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "ROSTER_JOB_MAX_LISTED", 2)
+
+    async def scenario():
+        job = await upload_sync(tmp_path, [
+            (f"R{number}", "Asha", "01-02-2003", "not-an-email", "9876543210") for number in range(5)
+        ])
+        assert job["error_count"] == 5
+        assert len(job["errors"]) == 2
+
+    asyncio.run(scenario())
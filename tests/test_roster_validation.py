@@ -0,0 +1,92 @@
+import openpyxl
+import pandas as pd
+import pytest
+
+from roster_import import RosterColumnsError, spool_roster, validate_roster
+
+FOLDER_COLUMNS = ["Roll Number", "Full Name", "DOB", "Email", "Phone Number"]
+
+
+def roster(*rows):
+    return pd.DataFrame([dict(zip(FOLDER_COLUMNS, row)) for row in rows], dtype=str)
+
+
+def test_valid_rows_become_student_records():
+    records, errors = validate_roster(
+        roster(("21CSE001", "  Asha Rao ", "01-02-2003", "asha@college.edu", "+91 98765-43210")),
+        FOLDER_COLUMNS
+    )
+    assert errors.empty
+    assert records == [{
+        "row": 2, "roll_number": "21CSE001", "full_name": "Asha Rao", "dob": "01-02-2003",
+        "email": "asha@college.edu", "phone_number": "+91 98765-43210"
+    }]
+
+
+def test_headers_match_case_and_whitespace_insensitively():
+    df = roster(("21CSE001", "Asha", "01-02-2003", "asha@college.edu", "9876543210"))
+    df.columns = ["roll  number", "FULL NAME", "dob", " Email", "phone number"]
+    records, errors = validate_roster(df, FOLDER_COLUMNS)
+    assert errors.empty and len(records) == 1
+
+
+def test_invalid_fields_are_reported_per_row():
+    records, errors = validate_roster(roster(
+        ("21CSE001", "Asha", "2003-02-01", "asha@college.edu", "9876543210"),
+        ("21CSE002", "Ravi", "01-02-2003", "not-an-email", "9876543210"),
+        ("21CSE003", "Meena", "01-02-2003", "meena@college.edu", "12"),
+        ("21CSE004", "Kiran", "31-02-2003", "kiran@college.edu", "9876543210"),
+        ("21CSE005", "", "01-02-2003", "x@college.edu", "9876543210"),
+    ), FOLDER_COLUMNS)
+    assert records == []
+    assert sorted(errors["row"]) == [2, 3, 4, 5, 6]
+
+
+def test_rows_with_a_blank_or_invalid_email_or_phone_are_rejected_alone():
+    records, errors = validate_roster(roster(
+        ("21CSE001", "Asha", "01-02-2003", "", "9876543210"),
+        ("21CSE002", "Ravi", "01-02-2003", "ravi@college.edu", ""),
+        ("21CSE003", "Meena", "01-02-2003", "meena@college.edu", "98765abc10"),
+        ("21CSE004", "Kiran", "01-02-2003", "kiran@college.edu", "9876543210"),
+    ), FOLDER_COLUMNS)
+    assert [record["roll_number"] for record in records] == ["21CSE004"]
+    assert list(errors["message"]) == [
+        "Missing Email", "Missing Phone Number", "Invalid phone number: 98765abc10"
+    ]
+
+
+def test_duplicate_roll_numbers_in_the_file_are_skipped_after_the_first():
+    records, errors = validate_roster(roster(
+        ("21CSE001", "Asha", "01-02-2003", "asha@college.edu", "9876543210"),
+        ("21CSE001", "Asha again", "01-02-2003", "asha@college.edu", "9876543210"),
+    ), FOLDER_COLUMNS)
+    assert [record["full_name"] for record in records] == ["Asha"]
+    assert list(errors["reason"]) == ["duplicate in file"]
+
+
+def test_missing_email_and_phone_columns_are_rejected():
+    df = roster(("21CSE001", "Asha", "01-02-2003", "asha@college.edu", "9876543210"))[["Roll Number", "Full Name", "DOB"]]
+    with pytest.raises(RosterColumnsError) as raised:
+        validate_roster(df, FOLDER_COLUMNS)
+    assert raised.value.missing == ["Email", "Phone Number"]
+
+
+@pytest.mark.parametrize("write", [
+    lambda path: path.with_suffix(".csv").write_text("Roll Number,Full Name,DOB\n"),
+    lambda path: path.with_suffix(".csv").write_text(""),
+])
+def test_header_only_and_empty_csv_files_fail_the_column_check(tmp_path, write):
+    source = tmp_path / "roster"
+    write(source)
+    with pytest.raises(RosterColumnsError):
+        spool_roster(str(source.with_suffix(".csv")), str(tmp_path / "out.spool"), FOLDER_COLUMNS)
+
+
+def test_header_only_workbook_fails_the_column_check(tmp_path):
+    workbook = openpyxl.Workbook()
+    workbook.active.append(["Roll Number", "Full Name", "DOB"])
+    workbook.save(tmp_path / "roster.xlsx")
+    with pytest.raises(RosterColumnsError) as raised:
+        spool_roster(str(tmp_path / "roster.xlsx"), str(tmp_path / "out.spool"), FOLDER_COLUMNS)
+    assert raised.value.missing == ["Email", "Phone Number"]
+
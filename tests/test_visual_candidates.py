@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+import server
+
+PHOTO = {"phash": "f0f0f0f0f0f0f0f0", "dhash": "0f0f0f0f0f0f0f0f"}
+SIMILAR_PHOTO = {"phash": "f0f0f0f0f0f0f0f1", "dhash": "0f0f0f0f0f0f0f0f"}
+
+
+def item(item_id, item_type, keyword, image_hashes=None):
+    return {
+        "id": item_id, "item_type": item_type, "item_keyword": keyword,
+        "category_id": server.resolve_item_category(keyword), "description": "", "location": "",
+        "created_date": "2026-03-01", "created_at": "2026-03-01T10:00:00", "image_hashes": image_hashes,
+    }
+
+
+@pytest.fixture
+def image_index(monkeypatch):
+    index = server.ImageHashIndex()
+    monkeypatch.setattr(server, "found_image_index", index)
+    return index
+
+
+def test_visual_neighbours_from_other_categories_are_scored(image_index):
+    lost = item("lost-1", "lost", "phone", PHOTO)
+    same_category = item("found-1", "found", "phone")
+    lookalike = item("found-2", "found", "wallet", SIMILAR_PHOTO)
+    unrelated = item("found-3", "found", "bottle")
+    image_index.add("found-2", SIMILAR_PHOTO)
+
+    neighbours = server.get_visual_neighbours([lost])
+    pairs = server.score_candidate_pairs([lost], [same_category, lookalike, unrelated], neighbours)
+    assert {found["id"] for _lost, found, _result in pairs} == {"found-1", "found-2"}
+
+
+def test_scoring_uses_the_snapshot_while_the_index_changes(image_index):
+    async def scenario():
+        lost = item("lost-1", "lost", "phone", PHOTO)
+        found = [item(f"found-{number}", "found", "wallet", SIMILAR_PHOTO) for number in range(50)]
+        for candidate in found:
+            image_index.add(candidate["id"], SIMILAR_PHOTO)
+
+        neighbours = server.get_visual_neighbours([lost])
+        scoring = asyncio.get_running_loop().run_in_executor(
+            None, server.score_candidate_pairs, [lost], found, neighbours
+        )
+        for candidate in found:  # Claimed or deleted on the loop while the thread scores
+            image_index.remove(candidate["id"])
+        pairs = await scoring
+        assert len(pairs) == 50
+
+    asyncio.run(scenario())